@@ -3,11 +3,10 @@ import hashlib
 import os
 import sys
 import time
-import json
-import subprocess   # ← 追加
-import re
 
-import requests
+# requests / subprocess / json / re は使う関数の中で import する（起動を軽くするため）。
+# hotfix_auto から 40 秒ごとに起動され、多くは「変更なし(100)」で終わるので、
+# その経路では HTTP スタック（requests）を読み込まずに済ませる。
 
 class TokenError(Exception):  # ← 追加
     """401 認証エラーなど、トークン再取得が必要な状態"""
@@ -60,6 +59,7 @@ def load_token_from_hotfix(path: str, prefer=("eg1account_token", "account_token
 
 def list_system_files(token: str, timeout: int = 25):
     """CloudStorage の system バケットにあるファイル一覧を取得"""
+    import requests
     url = "https://fngw-mcp-gc-livefn.ol.epicgames.com/fortnite/api/cloudstorage/system"
     headers = {
         "Authorization": f"Bearer {token}",
@@ -87,18 +87,39 @@ def guess_ext(content_type: str) -> str:
     if "text" in ct: return ".txt"
     return ".bin"
 
-def fetch_unique(token: str, unique: str, outdir: str, timeout: int = 25):
-    url = HOST + ENDPOINT_TMPL.format(unique=unique)
-    headers = {
+def fetch_headers(token: str) -> dict:
+    return {
         "Authorization": f"Bearer {token}",
         "Accept": "*/*",
         "Accept-Encoding": "gzip, deflate",
         "User-Agent": "CloudStorageFetcher/1.0 (+python-requests)",
     }
-    resp = requests.get(url, headers=headers, timeout=timeout)
+
+def fetch_unique(token: str, unique: str, outdir: str, timeout: int = 25, store=None):
+    import requests
+    url = HOST + ENDPOINT_TMPL.format(unique=unique)
+    resp = requests.get(url, headers=fetch_headers(token), timeout=timeout)
     if resp.status_code == 200:
-        data = resp.content
-        ct = resp.headers.get("Content-Type", "")
+        remember_validators(unique, resp.headers)
+    return handle_fetch_response(unique, resp.status_code, resp.content,
+                                 resp.headers.get("Content-Type", ""), resp.reason, outdir, store)
+
+def handle_fetch_response(unique: str, status: int, data: bytes, ct: str, reason: str,
+                          outdir: str, store=None):
+    """
+    取得結果（ステータス・本体）を保存し、{"type": ..., ...} を返す。
+    同期版 fetch_unique / 非同期版 fetch_unique_async で共通。
+    """
+    import json
+    if status == 200:
+        # 内容アドレス保存（--blob-store 指定時）：同一内容なら本体は増えない
+        if store is not None:
+            prev_sha = store.latest(unique)
+            sha = store.put(unique, data)
+            if prev_sha == sha:
+                print(f"[blob] {unique}: 前回と同一 (sha256={sha[:16]}…)")
+            else:
+                print(f"[blob] {unique}: 新しい版を保存 (sha256={sha[:16]}…)")
 
         def looks_like_hotfix_ini(t: str) -> bool:
             s = t.lstrip()
@@ -174,25 +195,332 @@ def fetch_unique(token: str, unique: str, outdir: str, timeout: int = 25):
             return {"type": "raw", "raw": text}
         return {"type": "binary", "raw": ""}
 
-    elif resp.status_code == 404:
+    elif status == 404:
         print(f"[404] {unique}: 見つかりませんでした")
         return None
-    elif resp.status_code == 401:
+    elif status == 401:
         # 401 は main 側で message 実行 → トークン再取得 → リトライさせたいので例外化
         raise TokenError(f"401 Unauthorized for {unique}")
     else:
-        print(f"[{resp.status_code}] {unique}: 取得失敗 reason={resp.reason}")
+        print(f"[{status}] {unique}: 取得失敗 reason={reason}")
         try:
-            print(resp.json())
+            print(json.loads(data))
         except Exception:
             pass
         return None
 
 
+# ====== 条件付きGETによる事前判定 ======
+VALIDATORS_FILE = ".validators.json"  # {outdir}/.validators.json: unique → ETag / Last-Modified
+RESPONSE_VALIDATORS = {}              # 今回の取得で得たもの（main の最後で保存）
+
+def remember_validators(unique: str, headers) -> None:
+    v = {}
+    if headers.get("ETag"):
+        v["etag"] = headers.get("ETag")
+    if headers.get("Last-Modified"):
+        v["last_modified"] = headers.get("Last-Modified")
+    if v:
+        RESPONSE_VALIDATORS[unique] = v
+
+def load_validators(outdir: str) -> dict:
+    import json
+    try:
+        with open(os.path.join(outdir, VALIDATORS_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_validators(outdir: str, extra: dict | None = None, drop=()) -> None:
+    """
+    drop … 今回 Hotfix.ini に書き込めなかった unique。
+    これらの validator を残すと、次回の事前確認が 304 だけで「変更なし」と判断してしまう。
+    """
+    import json
+    data = load_validators(outdir)
+    data.update(RESPONSE_VALIDATORS)
+    if extra:
+        data.update(extra)
+    for unique in drop:
+        data.pop(unique, None)
+    try:
+        os.makedirs(outdir, exist_ok=True)
+        with open(os.path.join(outdir, VALIDATORS_FILE), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"validators の保存に失敗: {e}", file=sys.stderr)
+
+def precheck_unchanged(token: str, targets, outdir: str, timeout: float = 25) -> bool:
+    """
+    前回の ETag / Last-Modified で条件付き GET（標準ライブラリの http.client のみ）を行い、
+    全件 304 Not Modified なら True。1 件でも 304 以外・情報不足・例外なら False（通常経路へ）。
+    サーバーが条件付きGETを無視する（同じ ETag で 200 を返す）と分かったら以後は行わない。
+    """
+    validators = load_validators(outdir)
+    if validators.get("_conditional") is False:
+        return False
+    if not all(u in validators for u in targets):
+        return False
+
+    import http.client
+    from urllib.parse import urlsplit
+    host = urlsplit(HOST).hostname
+    conn = http.client.HTTPSConnection(host, timeout=timeout)
+    try:
+        for unique in targets:
+            v = validators[unique]
+            headers = fetch_headers(token)
+            headers.pop("Accept-Encoding", None)
+            if v.get("etag"):
+                headers["If-None-Match"] = v["etag"]
+            if v.get("last_modified"):
+                headers["If-Modified-Since"] = v["last_modified"]
+            conn.request("GET", ENDPOINT_TMPL.format(unique=unique), headers=headers)
+            resp = conn.getresponse()
+            if resp.status == 304:
+                resp.read()  # 本文は空。読み切って同じ接続を次の要求に使う
+                continue
+            # 変更あり：本文は読まずに接続ごと閉じる（通常経路で取り直すので二重に落とさない）
+            resp.close()
+            if resp.status == 200 and v.get("etag") and resp.getheader("ETag") == v["etag"]:
+                print("条件付きGETに非対応のため、以後の事前判定を無効化します")
+                save_validators(outdir, {"_conditional": False})
+            return False
+        return True
+    except Exception as e:
+        print(f"事前判定をスキップ: {e}", file=sys.stderr)
+        return False
+    finally:
+        conn.close()
+
+def write_stale_report(path: str | None, stale, missing) -> None:
+    """--stale-out: 呼び出し側（hotfix_auto）が「一部だけ取れたサイクル」を判別できるように書き出す"""
+    if not path:
+        return
+    import json
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"stale": list(stale), "missing": list(missing)}, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"stale 情報の保存に失敗: {e}", file=sys.stderr)
+
+def load_client_token() -> str | None:
+    """tokens.json の client_token を読む"""
+    if not os.path.exists(TOKENS_JSON_FILE):
+        return None
+    import json
+    try:
+        with open(TOKENS_JSON_FILE, "r", encoding="utf-8") as f:
+            token = json.load(f).get("client_token")
+    except Exception as e:
+        print(f"tokens.json の読込に失敗: {e}", file=sys.stderr)
+        return None
+    if token:
+        print("tokens.json から client_token を読み込みました")
+    return token
+
+# ====== 非同期版（asyncio） ======
+# aiohttp があればそれを使い、無ければ requests をスレッドで回す。
+# どちらの場合も 1 リクエストごとの期限と 1 サイクル全体の期限を asyncio 側で管理する。
+PREVIOUS_EXTS = (".ini", ".json", ".txt", ".yml", ".xml", ".bin")
+
+def _run_in_daemon_thread(fn, *args, **kwargs):
+    """
+    ブロッキング関数をデーモンスレッドで実行し、asyncio.Future で結果を返す。
+    asyncio.to_thread と違い、キャンセル後に取り残されたスレッドが終了を引き止めない。
+    """
+    import asyncio
+    import threading
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def settle(result, exc):
+        if fut.done():  # キャンセル済み
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def work():
+        try:
+            result, exc = fn(*args, **kwargs), None
+        except BaseException as e:
+            result, exc = None, e
+        try:
+            loop.call_soon_threadsafe(settle, result, exc)
+        except RuntimeError:
+            pass  # ループ終了後に返ってきた stragglers は捨てる
+
+    threading.Thread(target=work, daemon=True).start()
+    return fut
+
+async def _http_get_async(url: str, headers: dict, timeout: float, session=None):
+    """(status, body, response_headers, reason) を返す"""
+    if session is not None:
+        import aiohttp
+        async with session.get(url, headers=headers,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            body = await resp.read()
+            return resp.status, body, resp.headers, resp.reason or ""
+    import requests
+    resp = await _run_in_daemon_thread(requests.get, url, headers=headers, timeout=timeout)
+    return resp.status_code, resp.content, resp.headers, resp.reason
+
+def _open_session():
+    try:
+        import aiohttp
+    except ImportError:
+        return None
+    return aiohttp.ClientSession()
+
+async def list_system_files_async(token: str, timeout: float = 25, session=None):
+    """list_system_files の非同期版"""
+    import asyncio
+    import json
+    url = "https://fngw-mcp-gc-livefn.ol.epicgames.com/fortnite/api/cloudstorage/system"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json",
+        "User-Agent": "CloudStorageFetcher/1.0 (+python-requests)",
+    }
+    status, body, _headers, reason = await asyncio.wait_for(
+        _http_get_async(url, headers, timeout, session), timeout)
+    if status == 401:
+        raise TokenError("401 Unauthorized in list_system_files")
+    if status >= 400:
+        raise RuntimeError(f"一覧取得失敗 status={status} reason={reason}")
+    return json.loads(body)
+
+async def fetch_unique_async(token: str, unique: str, outdir: str, timeout: float = 25,
+                             store=None, session=None):
+    """fetch_unique の非同期版。timeout を超えたら asyncio.TimeoutError"""
+    import asyncio
+    url = HOST + ENDPOINT_TMPL.format(unique=unique)
+    status, body, headers, reason = await asyncio.wait_for(
+        _http_get_async(url, fetch_headers(token), timeout, session), timeout)
+    if status == 200:
+        remember_validators(unique, headers)
+    return handle_fetch_response(unique, status, body, headers.get("Content-Type", ""),
+                                 reason, outdir, store)
+
+def load_previous(unique: str, outdir: str):
+    """
+    前回保存した {outdir}/{unique}.* を読み直し、fetch_unique と同じ形で返す（stale 扱い）。
+    """
+    import json
+    for ext in PREVIOUS_EXTS:
+        path = os.path.join(outdir, f"{unique}{ext}")
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except Exception:
+            return {"type": "binary", "raw": "", "stale": True}
+        if ext == ".json":
+            try:
+                return {"type": "json", "data": json.loads(text), "stale": True}
+            except Exception:
+                pass
+        if ext == ".ini":
+            return {"type": "ini", "raw": text, "stale": True}
+        return {"type": "raw", "raw": text, "stale": True}
+    return None
+
+SECTION_HEADER = "; ===== {unique} ====="  # Hotfix.ini 内の unique ごとの区切り行
+
+def load_previous_section(hotfix_path: str, unique: str):
+    """
+    前回のまとめ Hotfix.ini から unique の区切り以降（次の区切りまで）を読み出す（stale 扱い）。
+    個別保存が無い unique でも、前回の内容を Hotfix.ini に残すために使う。
+    """
+    if not os.path.exists(hotfix_path):
+        return None
+    header = SECTION_HEADER.format(unique=unique)
+    lines, inside = [], False
+    with open(hotfix_path, "r", encoding="utf-8", errors="ignore") as f:
+        for ln in f:
+            s = ln.rstrip("\n")
+            if s.startswith("; ===== ") and s.endswith(" ====="):
+                if inside:
+                    break
+                inside = s == header
+                continue
+            if inside:
+                lines.append(s)
+    if not inside:
+        return None
+    while lines and not lines[-1].strip():
+        lines.pop()  # 区切り前の空行はまとめ出力時に付け直す
+    return {"type": "ini", "raw": "\n".join(lines), "stale": True}
+
+async def fetch_all_async(token: str, targets, outdir: str, request_timeout: float = 25,
+                          cycle_deadline: float = 60, store=None,
+                          max_concurrency: int = 8, min_interval: float = 0.0):
+    """
+    targets を並列取得する（同時 max_concurrency 本まで、開始間隔は min_interval 秒以上）。
+    戻り値: (results, stale, unauthorized)
+      results      … unique → fetch_unique と同じ dict（None は 404 等）
+      stale        … 期限切れ/失敗した unique のリスト（前回保存分があれば results に入れてある）
+      unauthorized … 401 だった unique のリスト（呼び出し側でトークン再取得→再試行）
+    cycle_deadline を過ぎても終わらないリクエストはキャンセルし、待たずに返す。
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    pace_lock = asyncio.Lock()
+    next_start = [loop.time()]
+
+    async def fetch_one(u):
+        # 枠が空くまで待つ時間は 1 リクエストの期限に含めない（サイクル期限には含まれる）
+        async with sem:
+            if min_interval > 0:
+                async with pace_lock:
+                    delay = next_start[0] - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    next_start[0] = loop.time() + min_interval
+            return await fetch_unique_async(token, u, outdir, request_timeout, store, session)
+
+    session = _open_session()
+    try:
+        tasks = {asyncio.ensure_future(fetch_one(u)): u for u in targets}
+        done, pending = await asyncio.wait(tasks.keys(), timeout=cycle_deadline) if tasks else (set(), set())
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results, stale, unauthorized = {}, [], []
+        for t, u in tasks.items():
+            if t in pending:
+                print(f"[deadline] {u}: サイクル期限 {cycle_deadline}s 超過のためキャンセル", file=sys.stderr)
+            elif isinstance(t.exception(), TokenError):
+                unauthorized.append(u)
+                continue
+            elif t.exception() is not None:
+                exc = t.exception()
+                kind = "タイムアウト" if isinstance(exc, asyncio.TimeoutError) else f"失敗: {exc}"
+                print(f"[async] {u}: {kind}", file=sys.stderr)
+            else:
+                results[u] = t.result()
+                continue
+            stale.append(u)
+            prev = load_previous(u, outdir)
+            if prev is not None:
+                results[u] = prev
+        return results, stale, unauthorized
+    finally:
+        if session is not None:
+            await session.close()
+
+
 def try_load_token_from_sources():
     """
     既存の取得経路（Hotfix形式 → tokens.json → 環境変数）から再読込する。
     """
+    import json
     token = load_token_from_hotfix(HOTFIX_TOKEN_FILE)
     if not token and os.path.exists(TOKENS_JSON_FILE):
         try:
@@ -214,6 +542,7 @@ def refresh_token_via_message(message_path: str | None) -> str | None:
     message が無くても、まず保存先(HOTFIX/JSON/環境変数)からの再読込だけ試す。
     指定があれば message を実行してから再読込。
     """
+    import subprocess
     if not message_path:
         print("トークン再取得: messageファイルが指定されていません。保存先からの再読込のみ試します。")
         return try_load_token_from_sources()
@@ -252,6 +581,30 @@ def main():
                     help="Hotfixまとめiniの出力先")
     ap.add_argument("--changed-tables-out", default=None,
                     help="差分があった時、変更テーブルのリストをJSONで書き出すパス")
+    ap.add_argument("--blob-store", default=None,
+                    help="取得した本体を sha256 で圧縮保存する内容アドレス型ストアのフォルダ（履歴・重複排除）")
+    ap.add_argument("--blob-max-mb", type=int, default=None,
+                    help="--blob-store の合計サイズ上限MB（超えた分は古い版から削除）")
+    ap.add_argument("--blob-max-age-days", type=float, default=None,
+                    help="--blob-store でこの日数より古い版を削除")
+    ap.add_argument("--async-fetch", action="store_true",
+                    help="asyncio で並列取得する（期限超過分はキャンセルし、前回保存分を stale として使う）")
+    ap.add_argument("--request-timeout", type=float, default=25,
+                    help="1リクエストあたりの期限秒（既定: 25）")
+    ap.add_argument("--cycle-deadline", type=float, default=60,
+                    help="--async-fetch 時、1サイクル全体の期限秒（既定: 60）")
+    ap.add_argument("--max-concurrency", type=int, default=8,
+                    help="--async-fetch 時の同時リクエスト数の上限（既定: 8）。開始間隔は --sleep 秒あける")
+    ap.add_argument("--stale-out", default=None,
+                    help="今回取得できず前回分で代用した unique を JSON で書き出すパス"
+                         "（{\"stale\": [...], \"missing\": [...]}。missing は代用もできず Hotfix.ini から抜けたもの）")
+    ap.add_argument("--no-precheck", action="store_true",
+                    help="前回の ETag/Last-Modified による条件付きGETの事前判定を行わない")
+    ap.add_argument("--stream-diff", action="store_true",
+                    help="新旧Hotfix.iniを全量読み込みせず、外部ソートで差分テーブルを求める（巨大ファイル向け）。"
+                         "上限がかかるのは差分計算のメモリだけで、取得した本体は Hotfix.ini を書き出すまで全件メモリに保持する")
+    ap.add_argument("--diff-mem-mb", type=int, default=64,
+                    help="--stream-diff 時のソート用メモリ上限MB（既定: 64）")
     args = ap.parse_args()
 
     DEFAULT_MESSAGE_PATH = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/message.py"
@@ -263,49 +616,52 @@ def main():
             and sys.argv[1].lower().endswith((".py", ".bat", ".exe"))):
         args.message = sys.argv[1]
 
-    # まず既存のトークンを読みに行く
-    token = try_load_token_from_sources()
-
-    # 既存トークンが無い場合のみ message.py 実行
+    # tokens.json の client_token → 引数/環境変数。無ければ message.py 実行後に読み直す
+    token = load_client_token() or args.token or os.getenv("EPIC_ACCOUNT_TOKEN")
     if not token and args.message:
-        token = refresh_token_via_message(args.message)
-
-    # 2) tokens.json から client_token を読む
-    token = None
-    if os.path.exists(TOKENS_JSON_FILE):
-        try:
-            with open(TOKENS_JSON_FILE, "r", encoding="utf-8") as f:
-                tokens = json.load(f)
-                token = tokens.get("client_token")
-                if token:
-                    print("tokens.json から client_token を読み込みました")
-        except Exception as e:
-            print(f"tokens.json の読込に失敗: {e}", file=sys.stderr)
+        refresh_token_via_message(args.message)
+        token = load_client_token()
 
     if not token:
         print("エラー: client_token が取得できませんでした", file=sys.stderr)
         sys.exit(10)
 
-    # 3) それでも無ければ 引数/環境変数
-    if not token:
-        token = args.token or os.getenv("EPIC_ACCOUNT_TOKEN")
-
-    if not token:
-        print("エラー: アカウントトークンが取得できませんでした", file=sys.stderr)
-        sys.exit(10)
+    # 🔽 高速経路：前回の ETag/Last-Modified で条件付き GET し、全件 304 なら
+    #    requests を読み込む前に「変更なし」で終了する
+    if (not args.all and not args.no_precheck and os.path.exists(args.hotfix_out)
+            and precheck_unchanged(token, UNIQUE_FILENAMES, args.outdir, args.request_timeout)):
+        if args.changed_tables_out:
+            with open(args.changed_tables_out, "w", encoding="utf-8") as jf:
+                jf.write("[]")
+        write_stale_report(args.stale_out, [], [])
+        print("Hotfixに変更なし（条件付きGETで全件 304）")
+        sys.exit(100)
 
+    import json
 
     # 🔽 対象 unique を決定
+    cycle_start = time.monotonic()
+    if args.async_fetch:
+        # 一覧取得もサイクル期限の内側で行う（一覧が詰まってもサイクル全体は期限で終わる）
+        import asyncio
+
+        def list_files(tok):
+            return asyncio.run(list_system_files_async(
+                tok, min(args.request_timeout, args.cycle_deadline)))
+    else:
+        def list_files(tok):
+            return list_system_files(tok, args.request_timeout)
+
     if args.all:
         try:
             try:
-                index = list_system_files(token)
+                index = list_files(token)
             except TokenError:
                 token_new = refresh_token_via_message(args.message)
                 if token_new:
                     token = token_new
                     try:
-                        index = list_system_files(token)
+                        index = list_files(token)
                     except TokenError:
                         print("[401] 一覧取得: 再取得トークンでも認証失敗。処理を中止します。", file=sys.stderr)
                         sys.exit(12)
@@ -315,52 +671,112 @@ def main():
             targets = [item.get("uniqueFilename") for item in index if "uniqueFilename" in item]
             print(f"system 一覧から {len(targets)} 件を検出しました")
         except Exception as e:
-            print(f"一覧取得に失敗: {e}", file=sys.stderr)
+            print(f"一覧取得に失敗: {str(e) or type(e).__name__}", file=sys.stderr)
             sys.exit(11)
     else:
         targets = UNIQUE_FILENAMES  # 従来通り固定リスト
 
+    store = None
+    if args.blob_store:
+        import blob_store
+        store = blob_store.BlobStore(args.blob_store)
+
+    def passes_filter(data) -> bool:
+        # 🔽 --filter-text が指定されている場合は本文に含むものだけ集約
+        if not args.filter_text:
+            return True
+        body_text = None
+        if data.get("type") == "ini":
+            body_text = data.get("raw") or ""
+        elif data.get("type") == "json":
+            try:
+                body_text = json.dumps(data.get("data", {}), ensure_ascii=False)
+            except Exception:
+                body_text = ""
+        else:
+            body_text = data.get("raw") or ""
+        return args.filter_text in (body_text or "")
+
     total = 0
     ok = 0
+    fetched = set()  # 今回中身を得られた unique（validator を残してよいもの）
+    stale, missing = [], []  # --async-fetch で期限切れ/失敗したもの、そのうち代用も無かったもの
     all_data = {}
-    for unique in targets:
-        total += 1
-        try:
-            data = fetch_unique(token, unique, args.outdir)
-        except TokenError:
+    if args.async_fetch:
+        # 並列取得：遅いリクエストは期限でキャンセルし、前回分（stale）で埋める
+        # 期限は一覧取得にかかった分を差し引いた残り
+        remaining = max(0.0, args.cycle_deadline - (time.monotonic() - cycle_start))
+        results, stale, unauthorized = asyncio.run(fetch_all_async(
+            token, targets, args.outdir, args.request_timeout, remaining, store,
+            max_concurrency=args.max_concurrency, min_interval=args.sleep))
+        if unauthorized:
             token_new = refresh_token_via_message(args.message)
-            if token_new:
-                token = token_new
+            for unique in unauthorized:
+                if not token_new:
+                    print(f"[401] {unique}: トークン再取得できずスキップします。", file=sys.stderr)
+                    continue
                 try:
-                    data = fetch_unique(token, unique, args.outdir)
+                    results[unique] = fetch_unique(token_new, unique, args.outdir,
+                                                   timeout=args.request_timeout, store=store)
                 except TokenError:
                     print(f"[401] {unique}: 再取得トークンでも認証失敗。スキップします。", file=sys.stderr)
-                    continue
-            else:
-                print(f"[401] {unique}: トークン再取得できずスキップします。", file=sys.stderr)
-                continue
-
-        # data は {"type":"json","data":...} or {"type":"ini","raw": "..."} など
-        if data is not None:
-            # 🔽 --filter-text が指定されている場合は本文に含むものだけ集約
-            if args.filter_text:
-                body_text = None
-                if data.get("type") == "ini":
-                    body_text = data.get("raw") or ""
-                elif data.get("type") == "json":
+                except Exception as e:
+                    print(f"[async] {unique}: 再試行失敗: {e}", file=sys.stderr)
+        for unique in stale:
+            if unique not in results:
+                # 個別保存も無ければ、前回の Hotfix.ini の該当区間を残す（抜けると次回に全テーブルが「変更」扱いになる）
+                prev = load_previous_section(args.hotfix_out, unique)
+                if prev is not None:
+                    results[unique] = prev
+                else:
+                    missing.append(unique)
+        if stale:
+            print(f"[stale] 期限内に取得できず前回分を使用: {', '.join(stale)}", file=sys.stderr)
+        if missing:
+            print(f"[stale] 前回分も無く Hotfix.ini から抜けます: {', '.join(missing)}", file=sys.stderr)
+        for unique in targets:
+            total += 1
+            data = results.get(unique)
+            if data is not None:
+                fetched.add(unique)
+            if data is not None and passes_filter(data):
+                all_data[unique] = data
+                ok += 1
+    else:
+        for unique in targets:
+            total += 1
+            try:
+                data = fetch_unique(token, unique, args.outdir, store=store)
+            except TokenError:
+                token_new = refresh_token_via_message(args.message)
+                if token_new:
+                    token = token_new
                     try:
-                        body_text = json.dumps(data.get("data", {}), ensure_ascii=False)
-                    except Exception:
-                        body_text = ""
+                        data = fetch_unique(token, unique, args.outdir, store=store)
+                    except TokenError:
+                        print(f"[401] {unique}: 再取得トークンでも認証失敗。スキップします。", file=sys.stderr)
+                        continue
                 else:
-                    body_text = data.get("raw") or ""
-                if args.filter_text not in (body_text or ""):
-                    time.sleep(args.sleep)
+                    print(f"[401] {unique}: トークン再取得できずスキップします。", file=sys.stderr)
                     continue
 
-            all_data[unique] = data
-            ok += 1
-        time.sleep(args.sleep)
+            # data は {"type":"json","data":...} or {"type":"ini","raw": "..."} など
+            if data is not None:
+                fetched.add(unique)
+            if data is not None and passes_filter(data):
+                all_data[unique] = data
+                ok += 1
+            time.sleep(args.sleep)
+
+    write_stale_report(args.stale_out, stale, missing)
+
+    if store is not None and (args.blob_max_mb is not None or args.blob_max_age_days is not None):
+        removed = store.evict(
+            max_bytes=args.blob_max_mb << 20 if args.blob_max_mb is not None else None,
+            max_age_sec=args.blob_max_age_days * 86400 if args.blob_max_age_days is not None else None,
+        )
+        if removed:
+            print(f"[blob] 古い版を {removed} 件削除しました")
 
     out_hotfix = args.hotfix_out
     os.makedirs(os.path.dirname(out_hotfix), exist_ok=True)
@@ -370,7 +786,7 @@ def main():
     with open(tmp_out, "w", encoding="utf-8") as f:
         for unique, entry in all_data.items():
             # 区切り
-            f.write(f"; ===== {unique} =====\n")
+            f.write(SECTION_HEADER.format(unique=unique) + "\n")
 
             etype = entry.get("type")
 
@@ -424,43 +840,51 @@ def main():
             with open(args.changed_tables_out, "w", encoding="utf-8") as jf:
                 jf.write("[]")
         print("Hotfixに変更なし（まとめiniは前回と同一）")
+        save_validators(args.outdir, drop=set(targets) - fetched)
         sys.exit(100)
 
-    # 差分あり：行単位で DataTable の差分テーブル名だけ抽出
+    # 差分あり：行単位で DataTable / CurveTable 等の差分テーブル名だけ抽出
+    # （テーブル行の判定は hotfix_stream と共通）
     import collections
-    LINE_RE_DT = re.compile(r"^[+\-]?DataTable=([^;]+);")
+    import hotfix_stream
 
     def load_lines(path):
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
             return [ln.rstrip("\n") for ln in f]
 
     def split_dt_lines(lines):
-        # table名 -> そのテーブルに属する +DataTable=... 行の集合（同一行は重複排除）
+        # table名 -> そのテーブルに属する +DataTable=... / +CurveTable=... 行の集合（同一行は重複排除）
         m = collections.defaultdict(set)
-        for s in lines:
-            ms = LINE_RE_DT.match(s.strip())
-            if ms:
-                table_path = ms.group(1)  # 例: /LootCurrentSeason/DataTables/BlastBerryComposite_LP
-                base = os.path.splitext(os.path.basename(table_path))[0]  # → BlastBerryComposite_LP
-                m[base].add(s.strip())
+        for base, s in hotfix_stream.iter_table_lines(lines):
+            m[base].add(s)
         return m
 
-    new_lines = load_lines(tmp_out)
-    new_map = split_dt_lines(new_lines)
+    if args.stream_diff:
+        # ストリーミング差分：メモリ使用量は --diff-mem-mb で頭打ち
+        changed_tables = hotfix_stream.changed_tables_streaming(
+            out_hotfix if old_exists else None, tmp_out,
+            mem_cap=args.diff_mem_mb << 20,
+            tmpdir=os.path.dirname(out_hotfix) or None,
+        )
+    else:
+        new_lines = load_lines(tmp_out)
+        new_map = split_dt_lines(new_lines)
 
-    old_map = {}
-    if old_exists:
-        old_lines = load_lines(out_hotfix)
-        old_map = split_dt_lines(old_lines)
+        old_map = {}
+        if old_exists:
+            old_lines = load_lines(out_hotfix)
+            old_map = split_dt_lines(old_lines)
 
-    # 新旧で「内容が変わった」テーブルだけを抽出
-    changed_tables = sorted([
-        t for t in new_map.keys()
-        if new_map.get(t) != old_map.get(t, set())
-    ])
+        # 新旧で「内容が変わった」テーブルだけを抽出
+        changed_tables = sorted([
+            t for t in new_map.keys()
+            if new_map.get(t) != old_map.get(t, set())
+        ])
 
     # ここで実ファイルを差し替え
     os.replace(tmp_out, out_hotfix)
+    # validator は Hotfix.ini が実際に差し替わった後で保存する（途中で落ちたら次回は全件取得）
+    save_validators(args.outdir, drop=set(targets) - fetched)
 
     # --changed-tables-out が指定されているときだけ出力（差分テーブルのみ）
     if args.changed_tables_out:
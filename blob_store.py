@@ -0,0 +1,185 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from typing import BinaryIO, Dict, List, Optional
+
+try:
+    import zstandard  # 任意依存：あれば zstd、無ければ gzip で保存
+except ImportError:
+    zstandard = None
+
+REFS_FILE = "refs.jsonl"
+OBJECTS_DIR = "objects"
+
+class BlobStore:
+    """
+    sha256 をキーにした内容アドレス型の保存先。
+
+        {root}/objects/ab/abcdef....zst (or .gz)   … 圧縮済みの本体（同一内容は 1 個だけ）
+        {root}/refs.jsonl                           … uniqueFilename → sha256 の履歴（追記のみ）
+
+    同じ中身が別名で再配布されても本体は増えず、ref が 1 行増えるだけ。
+    """
+
+    def __init__(self, root: str, codec: Optional[str] = None):
+        self.root = root
+        if codec is None:
+            codec = "zstd" if zstandard is not None else "gzip"
+        if codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd を使うには zstandard パッケージが必要です")
+        self.codec = codec
+        os.makedirs(os.path.join(root, OBJECTS_DIR), exist_ok=True)
+        self._refs: Optional[List[dict]] = None
+
+    # ---- 本体 ----
+    def _ext(self, codec: str) -> str:
+        return ".zst" if codec == "zstd" else ".gz"
+
+    def _find_object(self, sha: str) -> Optional[str]:
+        d = os.path.join(self.root, OBJECTS_DIR, sha[:2])
+        for codec in ("zstd", "gzip"):
+            p = os.path.join(d, sha + self._ext(codec))
+            if os.path.exists(p):
+                return p
+        return None
+
+    def has(self, sha: str) -> bool:
+        return self._find_object(sha) is not None
+
+    def _write_object(self, sha: str, data: bytes) -> str:
+        d = os.path.join(self.root, OBJECTS_DIR, sha[:2])
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, sha + self._ext(self.codec))
+        if self.codec == "zstd":
+            payload = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            payload = gzip.compress(data, compresslevel=6, mtime=0)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return path
+
+    def open(self, sha: str) -> BinaryIO:
+        """
+        圧縮 blob をディスクに展開せず、読みながら伸長するストリームを返す。
+        """
+        path = self._find_object(sha)
+        if path is None:
+            raise KeyError(sha)
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"{path} の読込には zstandard パッケージが必要です")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return gzip.open(path, "rb")
+
+    def open_text(self, sha: str, encoding: str = "utf-8") -> io.TextIOWrapper:
+        return io.TextIOWrapper(self.open(sha), encoding=encoding, errors="ignore")
+
+    def read(self, sha: str) -> bytes:
+        with self.open(sha) as f:
+            return f.read()
+
+    # ---- ref（名前 → ハッシュ） ----
+    def _load_refs(self) -> List[dict]:
+        if self._refs is None:
+            self._refs = []
+            path = os.path.join(self.root, REFS_FILE)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    for ln in f:
+                        ln = ln.strip()
+                        if not ln:
+                            continue
+                        try:
+                            self._refs.append(json.loads(ln))
+                        except ValueError:
+                            continue  # 途中で落ちた書き込みなどは無視
+        return self._refs
+
+    def latest(self, name: str) -> Optional[str]:
+        for ref in reversed(self._load_refs()):
+            if ref.get("name") == name:
+                return ref.get("sha")
+        return None
+
+    def history(self, name: str) -> List[dict]:
+        return [r for r in self._load_refs() if r.get("name") == name]
+
+    def put(self, name: str, data: bytes) -> str:
+        """
+        data を保存して sha256 を返す。既に同じ中身があれば本体は書かない。
+        直前の ref と同じハッシュなら ref も追記しない（＝変更なし）。
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._find_object(sha)
+        if path is None:
+            self._write_object(sha, data)
+        else:
+            os.utime(path, None)  # 参照されたので経過時間の起点を更新
+
+        if self.latest(name) != sha:
+            ref = {"ts": time.time(), "name": name, "sha": sha, "size": len(data)}
+            with open(os.path.join(self.root, REFS_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(ref, ensure_ascii=False) + "\n")
+            self._load_refs().append(ref)
+        return sha
+
+    # ---- 掃除 ----
+    def _iter_objects(self):
+        base = os.path.join(self.root, OBJECTS_DIR)
+        for sub in os.listdir(base):
+            d = os.path.join(base, sub)
+            if not os.path.isdir(d):
+                continue
+            for fn in os.listdir(d):
+                if fn.endswith((".zst", ".gz")):
+                    p = os.path.join(d, fn)
+                    st = os.stat(p)
+                    yield fn.split(".", 1)[0], p, st.st_size, st.st_mtime
+
+    def evict(self, max_bytes: Optional[int] = None, max_age_sec: Optional[float] = None) -> int:
+        """
+        古い blob を削除する。各名前の最新版は常に残す。
+        max_age_sec より古いもの → 削除、その後 合計が max_bytes を超える分を古い順に削除。
+        削除した blob を指す ref は refs.jsonl から取り除く。戻り値は削除数。
+        """
+        keep: Dict[str, str] = {}
+        for ref in self._load_refs():
+            name, sha = ref.get("name"), ref.get("sha")
+            if name is None or sha is None:
+                continue  # 手で編集された不完全な ref は無視
+            keep[name] = sha
+        pinned = set(keep.values())
+
+        objs = sorted(self._iter_objects(), key=lambda o: o[3])  # 古い順
+        total = sum(o[2] for o in objs)
+        now = time.time()
+        removed = set()
+        for sha, path, size, mtime in objs:
+            if sha in pinned:
+                continue
+            too_old = max_age_sec is not None and now - mtime > max_age_sec
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed.add(sha)
+
+        if removed:
+            refs = [r for r in self._load_refs() if r.get("sha") not in removed]
+            path = os.path.join(self.root, REFS_FILE)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for r in refs:
+                    f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            os.replace(tmp, path)
+            self._refs = refs
+        return len(removed)
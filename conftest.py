@@ -0,0 +1,16 @@
+import pytest
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", default=False,
+                     help="時間のかかるテスト（巨大ファイル生成など）も実行する")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: --run-slow 指定時のみ実行する重いテスト")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="--run-slow を付けると実行")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
@@ -1,22 +1,36 @@
-import json, os, subprocess, sys, time, requests
+import json, os, shutil, subprocess, sys, threading, time, requests
+from concurrent.futures import ThreadPoolExecutor
 
 PY = sys.executable
 
 # ====== 設定 ======
+HOTFIX_INI = r"e:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/Hotfix.ini"
+# 期限内に取れず前回分で代用した unique（Hotfix取得.py --stale-out の出力）
+STALE_FILE = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/stale.json"
+
 HOTFIX_FETCH = [
     PY, r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/Hotfix取得.py",
     "--outdir", r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/cloudstorage_system",
-    "--hotfix-out", r"e:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/Hotfix.ini",
+    "--hotfix-out", HOTFIX_INI,
     "--changed-tables-out", r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/changed_tables.json",
     "--message", r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/message.py",
+    # 並列取得：1件あたり15秒、1サイクル30秒で打ち切り（遅いものは前回分で代用）
+    "--async-fetch", "--request-timeout", "15", "--cycle-deadline", "30",
+    "--stale-out", STALE_FILE,
 ]
 
+WATCH_CONFIG = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/hotfix_rules.yaml"
+
 WATCH_AND_UPDATE = [
     PY, r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/watch_and_update.py",
-    "--config", r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/hotfix_rules.yaml",
+    "--config", WATCH_CONFIG,
     "--once",
 ]
 
+# watch_and_update をこのプロセス内で呼ぶか（True: entrypoint グループのワーカープールが
+# サイクルをまたいで温まったまま使える / False: 毎回 WATCH_AND_UPDATE を別プロセスで起動）
+IN_PROCESS_UPDATE = True
+
 # Discord Webhook（←自分のURLに差し替え）
 DISCORD_WEBHOOK_URL = "https://discord.com/api/webhooks/1408009764490973194/QD_Mi9Umhnsj3lrKbenSm1FKNZBoY5Rf6btZs6BzrUB6tP-zdGui373jlb0qDTskSYfI"
 
@@ -35,6 +49,75 @@ GIT_BRANCH = "main"
 # ループ間隔(秒)
 INTERVAL_SECONDS = 40
 
+# 検出→最初の公開(push) までの時間を追記する JSON Lines ファイル（None なら記録しない）
+METRICS_FILE = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/metrics.jsonl"
+
+# 更新処理（watch_and_update → Git）をバックグラウンドで回し、次の取得と重ねるか
+# ※更新処理同士は重ならない（1本ずつ順番に実行）
+OVERLAP_DOWNSTREAM = True
+
+# 更新処理には取得直後の Hotfix.ini のコピーを渡す（次の取得が本体を書き換えても影響しない）
+SNAPSHOT_DIR = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/cycle_snapshots"
+SNAPSHOT_KEEP = 10  # 残しておくスナップショット数
+
+# ローカル制御API（GET /health, POST /poll-now, /pause?group=X, /resume?group=X）
+# Host / Origin がローカル以外の要求は 403、存在しないグループ名は 404
+# CONTROL_PORT = None なら起動しない。外部に公開しないこと（127.0.0.1 のまま使う）
+# 停止中に発火しなかった変更は /health の skipped_changes に残り、/resume で該当グループだけ再実行する
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 8765
+# POST には CONTROL_HEADER ヘッダーが必須（ブラウザの単純なクロスサイト POST では付けられない）。
+# CONTROL_TOKEN を設定した場合はヘッダーの値がこれと一致する必要がある。
+#   例: curl -X POST -H "X-Hotfix-Control: <token>" "http://127.0.0.1:8765/pause?group=BR"
+CONTROL_HEADER = "X-Hotfix-Control"
+CONTROL_TOKEN = None
+LOCAL_HOSTNAMES = ("127.0.0.1", "localhost", "::1")
+
+# /health でトークン期限を見るための tokens.json（message.py の保存先）
+TOKENS_JSON_FILE = r"E:/フォートナイト/Picture/Loot Pool/TEST4/Hotfix/tokens.json"
+
+
+# ====== 状態（/health 用） ======
+STATUS_LOCK = threading.Lock()
+STATUS = {
+    "started_at": time.time(),
+    "last_fetch": None,          # 最後に Hotfix取得 が終わった時刻
+    "last_fetch_rc": None,
+    "last_success_fetch": None,  # rc が 0 / 100 だった最後の時刻
+    "last_change": None,         # 最後に差分を検出した時刻
+    "last_change_tables": [],
+    "last_fetch_stale": [],      # 最後の取得で前回分を使った unique（空でなければ一部だけ取れたサイクル）
+    "last_fetch_missing": [],    # 前回分も無く Hotfix.ini から抜けた unique
+    "last_publish": None,        # 最後に push できた時刻
+    "last_detect_to_publish_sec": None,
+}
+PAUSED_GROUPS = set()            # 一時停止中のグループ（"*" は全グループ）
+SKIPPED_CHANGES = {}             # 停止中に実行しなかったグループ → 変更テーブル（再開時に再実行）
+POLL_NOW = threading.Event()     # /poll-now で待機を打ち切る
+
+def set_status(**fields):
+    with STATUS_LOCK:
+        STATUS.update(fields)
+
+class CountingExecutor:
+    """ThreadPoolExecutor に「未完了ジョブ数」を数える機能を足したもの（/health のキュー深さ用）"""
+
+    def __init__(self, name):
+        self._ex = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def _done(self, _fut):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            self.pending += 1
+        fut = self._ex.submit(fn, *args, **kwargs)
+        fut.add_done_callback(self._done)
+        return fut
+
 
 # ====== Discord通知ユーティリティ ======
 def _post_discord(content: str, mandatory: bool = False):
@@ -55,6 +138,20 @@ def notify_info(msg: str):
 def notify_error(msg: str):
     _post_discord(f"❌ {msg}", mandatory=True)  # エラーは必ず
 
+def notify_stage(group, rc, elapsed, publish="published"):
+    """
+    publish: "published"（push 済み）/ "nochange"（公開する変更なし）
+             / "deferred"（他グループの完了後にまとめて公開）/ "failed"（Git エラーは別途通知済み）
+    """
+    if rc != 0:
+        notify_error(f"{group} の更新処理が失敗 rc={rc}")
+    elif publish == "published":
+        _post_discord(f"📦 {group} 反映完了（検出から {elapsed:.1f}秒）", mandatory=True)  # 段階通知も必ず
+    elif publish == "deferred":
+        notify_info(f"{group} の更新処理完了（公開は残りのグループの完了後）")  # optional
+    elif publish == "nochange":
+        notify_info(f"{group} の更新処理完了（公開する変更なし）")  # optional
+
 def notify_update(tables):
     head = "@everyone\n" if MENTION_EVERYONE_ON_UPDATE else ""
     body = "✅ Hotfix更新あり\n変更されたテーブル:\n" + "\n".join(f"- {t}" for t in tables)
@@ -78,27 +175,35 @@ def git_has_changes(repo_dir, include_paths):
         notify_info("Git変更なし。プッシュしません。")  # optional
     return changed
 
+_GIT_LOCK = threading.Lock()  # 優先/バックグラウンドのグループが同時に push しないように
+
 def git_commit_and_push(repo_dir, include_paths, message):
+    """コミット〜プッシュまで成功したら True"""
+    with _GIT_LOCK:
+        return _git_commit_and_push(repo_dir, include_paths, message)
+
+def _git_commit_and_push(repo_dir, include_paths, message):
     p = _run_git(["add"] + include_paths, repo_dir)
     if p.returncode != 0:
         msg = f"git add 失敗: {p.stderr.strip()}"
         print("[AUTO]", msg)
         notify_error(msg)  # 必ず
-        return
+        return False
 
-    p = _run_git(["diff", "--cached", "--quiet"], repo_dir)
+    # 前回の失敗でステージに残ったものを巻き込まないよう、差分確認もコミットも include_paths に限定
+    p = _run_git(["diff", "--cached", "--quiet", "--"] + include_paths, repo_dir)
     if p.returncode == 0:
         msg = "コミット対象なし（ステージに変更なし）。"
         print("[AUTO]", msg)
         notify_info(msg)  # optional
-        return
+        return False
 
-    p = _run_git(["commit", "-m", message], repo_dir)
+    p = _run_git(["commit", "-m", message, "--"] + include_paths, repo_dir)
     if p.returncode != 0:
         msg = f"git commit 失敗: {p.stderr.strip()}"
         print("[AUTO]", msg)
         notify_error(msg)  # 必ず
-        return
+        return False
     notify_info(f"Gitコミット完了: {message}")  # optional
 
     p = _run_git(["push", "origin", GIT_BRANCH], repo_dir)
@@ -106,14 +211,33 @@ def git_commit_and_push(repo_dir, include_paths, message):
         msg = f"git push 失敗: {p.stderr.strip()}"
         print("[AUTO]", msg)
         notify_error(msg)  # 必ず
-        return
+        return False
 
     print("[AUTO] GitHubへプッシュ完了。")
     notify_info("GitHubへプッシュ完了。")  # optional
+    return True
 
 
 # ====== メイン処理 ======
-def run_once():
+def read_stale_report():
+    try:
+        with open(STALE_FILE, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except Exception:
+        return
+    stale, missing = report.get("stale") or [], report.get("missing") or []
+    set_status(last_fetch_stale=stale, last_fetch_missing=missing)
+    if stale:
+        msg = f"一部のファイルを期限内に取得できず前回分で代用: {', '.join(stale)}"
+        if missing:
+            msg += f"（前回分も無し: {', '.join(missing)}）"
+        print("[AUTO]", msg)
+        notify_info(msg)  # optional
+
+def fetch_changes():
+    """
+    Hotfix取得を実行し、変更テーブルのリストを返す（変更なし・失敗時は None）。
+    """
     notify_info("Hotfixチェック開始")  # optional
 
     # 1) Hotfix取得
@@ -123,8 +247,15 @@ def run_once():
         msg = f"Hotfix取得の起動に失敗: {e}"
         print("[AUTO]", msg)
         notify_error(msg)  # 必ず
+        set_status(last_fetch=time.time(), last_fetch_rc=None)
         return
 
+    now = time.time()
+    set_status(last_fetch=now, last_fetch_rc=p.returncode)
+    if p.returncode in (0, 100):
+        set_status(last_success_fetch=now)
+        read_stale_report()
+
     if p.returncode == 100:
         msg = f"Hotfix差分なし。更新処理は行いません。{INTERVAL_SECONDS}秒待機中..."
         print("[AUTO]", msg)
@@ -159,15 +290,152 @@ def run_once():
         notify_info(msg)  # optional
         return
 
+    set_status(last_change=time.time(), last_change_tables=list(tables))
+    return tables
+
+# fast 以外のグループを回すスレッド（次サイクルの fast レーンを待たせない）
+BACKGROUND = CountingExecutor("background")
+# 更新処理（OVERLAP_DOWNSTREAM 時）を順番に回すスレッド
+DOWNSTREAM = CountingExecutor("downstream")
+
+def record_metric(**fields):
+    if not METRICS_FILE:
+        return
+    try:
+        with open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(fields, ts=time.time()), ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"[AUTO] メトリクス記録失敗: {e}", file=sys.stderr)
+
+def group_publish_paths(cfg):
+    """グループ名 → publish_paths（GIT_REPO_DIR からの相対パス。未指定なら空）"""
+    return {g["name"]: list(g.get("publish_paths") or []) for g in cfg.get("groups", [])}
+
+def shared_publish_paths(owned):
+    # publish_paths を持たないグループ用：他グループの出力先は除外して公開する
+    excluded = sorted({p for paths in owned.values() for p in paths})
+    return GIT_INCLUDE_PATHS + [f":(exclude){p}" for p in excluded]
+
+def make_publisher(tables, detected_at, cfg):
+    """
+    グループ完了ごとに 通知 → Git公開 を行うコールバックを作る。
+    公開するのはそのグループの publish_paths だけ（実行中の他グループの出力を巻き込まない）。
+    publish_paths の無いグループは保留し、publish_deferred() でまとめて公開する。
+    最初に公開できた時点で「検出→最初の公開」の時間を記録する。
+    戻り値: (on_group_done, publish_deferred)
+    """
+    owned = group_publish_paths(cfg)
+    state = {"first": True, "deferred": []}
+    lock = threading.Lock()
+
+    def publish(paths, label):
+        """戻り値は notify_stage の publish"""
+        if not git_has_changes(GIT_REPO_DIR, paths):
+            return "nochange"
+        if not git_commit_and_push(GIT_REPO_DIR, paths,
+                                   f"Hotfix更新: {label} ({', '.join(tables)})"):
+            return "failed"
+        set_status(last_publish=time.time())
+        with lock:
+            first, state["first"] = state["first"], False
+        if first:
+            latency = time.time() - detected_at
+            set_status(last_detect_to_publish_sec=round(latency, 3))
+            print(f"[AUTO] 検出→最初の公開: {latency:.1f}秒 ({label})")
+            record_metric(metric="detect_to_first_publish_sec", value=round(latency, 3),
+                          group=label, tables=tables)
+        return "published"
+
+    # 「反映完了」は実際に push できた後で通知する
+    def on_group_done(group, rc):
+        if rc != 0:
+            notify_stage(group, rc, time.time() - detected_at)
+        elif owned.get(group):
+            result = publish(owned[group], group)
+            notify_stage(group, rc, time.time() - detected_at, result)
+        else:
+            with lock:
+                state["deferred"].append(group)
+            notify_stage(group, rc, time.time() - detected_at, "deferred")
+
+    def publish_deferred():
+        with lock:
+            groups, state["deferred"] = state["deferred"], []
+        if groups:
+            label = ", ".join(groups)
+            result = publish(shared_publish_paths(owned), label)
+            notify_stage(label, 0, time.time() - detected_at, result)
+
+    return on_group_done, publish_deferred
+
+def take_snapshot():
+    """
+    Hotfix.ini をサイクル専用のファイルにコピーしてそのパスを返す。
+    更新処理はこのコピーだけを読むので、次サイクルの取得と同じファイルを奪い合わない。
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = os.path.join(SNAPSHOT_DIR, f"Hotfix_{int(time.time() * 1000)}.ini")
+    shutil.copyfile(HOTFIX_INI, path)
+
+    # 古いスナップショットを掃除（使用中で消せないものは次回に回す）
+    olds = sorted(f for f in os.listdir(SNAPSHOT_DIR) if f.startswith("Hotfix_"))
+    for f in olds[:-SNAPSHOT_KEEP]:
+        try:
+            os.remove(os.path.join(SNAPSHOT_DIR, f))
+        except OSError:
+            pass
+    return path
+
+def record_skipped(group, tables):
+    with STATUS_LOCK:
+        SKIPPED_CHANGES.setdefault(group, set()).update(tables)
+
+def run_downstream(tables, detected_at=None, hotfix_file=None, only_groups=None, announce=True):
+    """
+    only_groups を渡すとそのグループだけ実行する（一時停止の再開時）。
+    announce=False なら「Hotfix更新あり」の通知は出さない（検出時に通知済みのとき）。
+    """
+    if detected_at is None:
+        detected_at = time.time()
+    if hotfix_file is None:
+        hotfix_file = HOTFIX_INI
+
     # 3) 更新通知（必ず）
-    notify_update(tables)
+    if announce:
+        notify_update(tables)
 
     # 4) 更新処理（watch_and_update 実行）
-    only_arg = "--only-tables=" + ",".join(tables)
-    cmd = WATCH_AND_UPDATE + [only_arg]
-    notify_info(f"更新処理実行: {' '.join(cmd)}")  # optional
     try:
-        subprocess.run(cmd, text=True)
+        if IN_PROCESS_UPDATE:
+            # priority 順に実行し、グループごとに通知・公開（fast 以外はバックグラウンド）
+            import watch_and_update
+            notify_info(f"更新処理実行(プロセス内): {', '.join(tables)}")  # optional
+            cfg = watch_and_update.load_cfg(WATCH_CONFIG)
+            cfg["hotfix"]["file"] = hotfix_file
+            on_group_done, publish_deferred = make_publisher(tables, detected_at, cfg)
+            watch_and_update.one_cycle(cfg, None, only_tables=set(tables),
+                                       on_group_done=on_group_done,
+                                       background=BACKGROUND,
+                                       skip_groups=paused_groups(),
+                                       on_group_skipped=record_skipped,
+                                       only_groups=only_groups)
+            # BACKGROUND は 1 本ずつ順番に実行するので、このサイクルのバックグラウンド分の後に公開される
+            BACKGROUND.submit(publish_deferred)
+            return
+        else:
+            only_arg = "--only-tables=" + ",".join(tables)
+            cmd = WATCH_AND_UPDATE + [only_arg, "--hotfix-file=" + hotfix_file]
+            paused = paused_groups()
+            if paused:
+                cmd.append("--skip-groups=" + ",".join(sorted(paused)))
+            if only_groups is not None:
+                cmd.append("--only-groups=" + ",".join(sorted(only_groups)))
+            notify_info(f"更新処理実行: {' '.join(cmd)}")  # optional
+            subprocess.run(cmd, text=True)
+            # 別プロセスではどのグループが発火したか分からないので、停止中グループ全てに記録
+            # （再開時は only_tables で絞るので、該当しないグループは何もしない）
+            for group in paused:
+                record_skipped(group, tables)
     except Exception as e:
         msg = f"watch_and_update 実行失敗: {e}"
         print("[AUTO]", msg)
@@ -176,13 +444,214 @@ def run_once():
 
     # 5) GitHubへプッシュ（New Lootの変更を反映）
     if git_has_changes(GIT_REPO_DIR, GIT_INCLUDE_PATHS):
-        git_commit_and_push(GIT_REPO_DIR, GIT_INCLUDE_PATHS, f"Hotfix更新: {', '.join(tables)}")
+        if git_commit_and_push(GIT_REPO_DIR, GIT_INCLUDE_PATHS, f"Hotfix更新: {', '.join(tables)}"):
+            set_status(last_publish=time.time())
+
+def resume_skipped(skipped):
+    """
+    停止中に実行しなかった変更を、最新の Hotfix.ini で該当グループだけ再実行する。
+    skipped: グループ → 変更テーブル（"*" を含むなら全グループ）
+    """
+    tables = sorted(set().union(*skipped.values()))
+    only_groups = None if "*" in skipped else set(skipped)
+    notify_info(f"再開により再実行: {', '.join(sorted(skipped))} ({', '.join(tables)})")  # optional
+    snapshot = take_snapshot()
+    run_downstream(tables, time.time(), snapshot, only_groups=only_groups, announce=False)
+
+def run_once():
+    tables = fetch_changes()
+    if tables:
+        try:
+            snapshot = take_snapshot()
+        except OSError as e:
+            msg = f"Hotfix.ini のスナップショット作成に失敗: {e}"
+            print("[AUTO]", msg)
+            notify_error(msg)  # 必ず
+            return
+        run_downstream(tables, time.time(), snapshot)
+
+# ====== ローカル制御API ======
+def paused_groups():
+    with STATUS_LOCK:
+        return set(PAUSED_GROUPS)
+
+def token_expiry():
+    """tokens.json の client_token_expires_at（message.py が保存）を返す"""
+    try:
+        with open(TOKENS_JSON_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("client_token_expires_at")
+    except Exception:
+        return None
+
+def health():
+    with STATUS_LOCK:
+        h = dict(STATUS)
+        h["paused_groups"] = sorted(PAUSED_GROUPS)
+        h["skipped_changes"] = {g: sorted(t) for g, t in SKIPPED_CHANGES.items()}
+    h["now"] = time.time()
+    h["token_expires_at"] = token_expiry()
+    h["queue"] = {"downstream": DOWNSTREAM.pending, "background": BACKGROUND.pending}
+    return h
+
+def known_groups():
+    """hotfix_rules.yaml のグループ名（読めなければ None）"""
+    try:
+        import watch_and_update
+        cfg = watch_and_update.load_cfg(WATCH_CONFIG)
+        return {g["name"] for g in cfg.get("groups", [])}
+    except Exception as e:
+        print(f"[AUTO] {WATCH_CONFIG} を読めません: {e}", file=sys.stderr)
+        return None
+
+def _is_local(value):
+    """Host / Origin ヘッダーの値がローカルを指しているか"""
+    from urllib.parse import urlsplit
+    if "//" not in value:
+        value = "//" + value
+    try:
+        return urlsplit(value).hostname in LOCAL_HOSTNAMES
+    except ValueError:
+        return False
+
+def start_control_server(host=CONTROL_HOST, port=CONTROL_PORT):
+    """
+    制御APIをデーモンスレッドで起動する。ハンドラは状態の読み書きとイベント通知だけなので、
+    ループ側のサイクルを止めることはない。
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code, obj):
+            body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _rejected(self, need_header):
+            """ローカル以外（DNS リバインディング・他サイト）からの要求なら 403 を返して True"""
+            origin = self.headers.get("Origin")
+            if not _is_local(self.headers.get("Host") or "") or (origin and not _is_local(origin)):
+                self._reply(403, {"error": "forbidden"})
+                return True
+            if need_header:
+                import hmac
+                value = self.headers.get(CONTROL_HEADER)
+                if value is None or (CONTROL_TOKEN and not hmac.compare_digest(value, CONTROL_TOKEN)):
+                    self._reply(403, {"error": f"{CONTROL_HEADER} ヘッダーが必要です"})
+                    return True
+            return False
+
+        def do_GET(self):
+            if self._rejected(need_header=False):
+                return
+            if urlsplit(self.path).path == "/health":
+                self._reply(200, health())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self._rejected(need_header=True):
+                return
+            u = urlsplit(self.path)
+            group = (parse_qs(u.query).get("group") or ["*"])[0]
+            if u.path in ("/pause", "/resume") and group != "*":
+                names = known_groups()
+                if names is None:
+                    self._reply(503, {"error": "設定ファイルを読めません"})
+                    return
+                if group not in names:
+                    self._reply(404, {"error": f"不明なグループ: {group}", "groups": sorted(names)})
+                    return
+            if u.path == "/poll-now":
+                POLL_NOW.set()
+                self._reply(200, {"ok": True})
+            elif u.path == "/pause":
+                with STATUS_LOCK:
+                    PAUSED_GROUPS.add(group)
+                print(f"[AUTO] 一時停止: {group}")
+                self._reply(200, {"ok": True, "paused_groups": sorted(paused_groups())})
+            elif u.path == "/resume":
+                with STATUS_LOCK:
+                    if group != "*" and "*" in PAUSED_GROUPS:
+                        conflict = True
+                    else:
+                        conflict = False
+                        if group == "*":
+                            PAUSED_GROUPS.clear()
+                            skipped = dict(SKIPPED_CHANGES)
+                            SKIPPED_CHANGES.clear()
+                        else:
+                            PAUSED_GROUPS.discard(group)
+                            skipped = {group: SKIPPED_CHANGES.pop(group)} if group in SKIPPED_CHANGES else {}
+                if conflict:
+                    # 個別に再開しても "*" で止まったままなので受け付けない
+                    self._reply(409, {"error": "全グループ（*）が一時停止中です。/resume?group=* で再開してください",
+                                      "paused_groups": sorted(paused_groups())})
+                    return
+                print(f"[AUTO] 再開: {group}")
+                if skipped:
+                    fut = DOWNSTREAM.submit(resume_skipped, skipped)
+                    fut.add_done_callback(_log_downstream_error)
+                self._reply(200, {"ok": True, "paused_groups": sorted(paused_groups()),
+                                  "rerun": {g: sorted(t) for g, t in skipped.items()}})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def log_message(self, fmt, *args):
+            pass  # アクセスログは出さない
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="control", daemon=True).start()
+    print(f"[AUTO] 制御API: http://{host}:{port}/health")
+    return server
+
+def wait_next_poll():
+    # INTERVAL_SECONDS 待つ。/poll-now が来たらすぐ戻る
+    if POLL_NOW.wait(INTERVAL_SECONDS):
+        print("[AUTO] /poll-now により即時チェックします")
+    POLL_NOW.clear()
+
+def _log_downstream_error(fut):
+    exc = fut.exception()
+    if exc is not None:
+        msg = f"更新処理で例外: {exc}"
+        print("[AUTO]", msg)
+        notify_error(msg)  # 必ず
 
 def main():
+    if CONTROL_PORT:
+        try:
+            start_control_server()
+        except OSError as e:
+            print(f"[AUTO] 制御APIを起動できません: {e}", file=sys.stderr)
+
+    if not OVERLAP_DOWNSTREAM:
+        while True:
+            run_once()
+            notify_info(f"{INTERVAL_SECONDS}秒待機中...")  # optional
+            wait_next_poll()
+
+    # 更新処理は専用スレッドで順番に実行し、その間も取得ループは止めない
     while True:
-        run_once()
+        tables = fetch_changes()
+        if tables:
+            # 次の取得より前に、このサイクルの Hotfix.ini を固定しておく
+            try:
+                snapshot = take_snapshot()
+            except OSError as e:
+                msg = f"Hotfix.ini のスナップショット作成に失敗: {e}"
+                print("[AUTO]", msg)
+                notify_error(msg)  # 必ず
+                wait_next_poll()
+                continue
+            fut = DOWNSTREAM.submit(run_downstream, tables, time.time(), snapshot)
+            fut.add_done_callback(_log_downstream_error)
         notify_info(f"{INTERVAL_SECONDS}秒待機中...")  # optional
-        time.sleep(INTERVAL_SECONDS)
+        wait_next_poll()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# ops の別名（Hotfix.ini では RowAdd / AddRow が混在している）
+ADD_OPS = ("AddRow", "RowAdd")
+REMOVE_OPS = ("RowRemove", "RowDelete", "RemoveRow")
+
+# 値の解釈方法を変えたら上げる（保存済みの digest と一致しなくなり、全テーブルを作り直す）
+VALUE_FORMAT = "2"
+
+_INT_RE = re.compile(r"^[+-]?\d+$")
+_FLOAT_RE = re.compile(r"^[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?$")
+
+def _decode_json_payload(raw: str) -> Any:
+    """
+    AddRow / TableUpdate の本体 "…;AddRow;\"{\\\"Name\\\":…}\"" を Python 値にする。
+    本体は JSON 文字列リテラルの中に JSON が入った二重エンコード。
+    """
+    payload = raw.split(";", 2)[2] if raw.count(";") >= 2 else ""
+    payload = payload.strip()
+    value = json.loads(payload)
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+def _split_top(text: str) -> List[str]:
+    """カンマ区切りを分割する（括弧・引用符の中のカンマでは切らない）"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+def parse_ue_value(text: str) -> Any:
+    """
+    RowUpdate の値（UE のテキスト形式）を AddRow / TableUpdate の JSON と同じ型にする。
+        "3" → 3, "1.000000" → 1.0, "True" → True, "\"abc\"" → "abc"
+        "(X=1.000000,Y=2.000000)" → {"X": 1.0, "Y": 2.0}, "(1,0,0)" → [1, 0, 0]
+    それ以外（パス・名前など）は文字列のまま。
+    """
+    s = text.strip()
+    if _INT_RE.match(s):
+        return int(s)
+    if _FLOAT_RE.match(s):
+        return float(s)
+    if s in ("True", "False"):
+        return s == "True"
+    if len(s) >= 2 and s[0] == s[-1] == '"':
+        return s[1:-1]
+    if len(s) >= 2 and s[0] == "(" and s[-1] == ")":
+        inner = s[1:-1].strip()
+        if not inner:
+            return []
+        parts = _split_top(inner)
+        fields = [p.partition("=") for p in parts]
+        if all(sep and key.strip() and "(" not in key for key, sep, _ in fields):
+            return {key.strip(): parse_ue_value(value) for key, _, value in fields}
+        return [parse_ue_value(p) for p in parts]
+    return text
+
+class TableState:
+    """
+    1 テーブル分のマージ済み状態（列指向）。
+
+        rows    … 行名のリスト（行番号 = インデックス）
+        columns … 列名 → 各行の値リスト（未設定は None）
+    """
+
+    def __init__(self, kind: str = ""):
+        self.kind = kind
+        self.rows: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.columns: Dict[str, List[Any]] = {}
+        self._dead: set = set()
+
+    def _row_idx(self, row: str) -> int:
+        i = self.index.get(row)
+        if i is None:
+            i = len(self.rows)
+            self.rows.append(row)
+            self.index[row] = i
+            for col in self.columns.values():
+                col.append(None)
+        else:
+            self._dead.discard(i)
+        return i
+
+    def set(self, row: str, col: str, value: Any) -> None:
+        i = self._row_idx(row)
+        values = self.columns.get(col)
+        if values is None:
+            values = self.columns[col] = [None] * len(self.rows)
+        values[i] = value
+
+    def put_row(self, row: str, values: Dict[str, Any]) -> None:
+        # 行を丸ごと置き換え（AddRow / TableUpdate）
+        i = self._row_idx(row)
+        for col in self.columns.values():
+            col[i] = None
+        for col, v in values.items():
+            self.set(row, col, v)
+
+    def remove(self, row: str) -> None:
+        # 値も消しておく（後で同名の行が追加・更新されても古い列が残らないように）
+        i = self.index.get(row)
+        if i is not None:
+            for col in self.columns.values():
+                col[i] = None
+            self._dead.add(i)
+
+    def clear(self) -> None:
+        self.rows, self.index, self.columns, self._dead = [], {}, {}, set()
+
+    def compact(self) -> None:
+        """削除済み行と全て None の列を詰める"""
+        if self._dead:
+            keep = [i for i in range(len(self.rows)) if i not in self._dead]
+            self.rows = [self.rows[i] for i in keep]
+            self.columns = {c: [v[i] for i in keep] for c, v in self.columns.items()}
+            self.index = {r: i for i, r in enumerate(self.rows)}
+            self._dead = set()
+        self.columns = {c: v for c, v in self.columns.items() if any(x is not None for x in v)}
+
+    # ---- 読み出し ----
+    def get(self, row: str, col: str, default: Any = None) -> Any:
+        i = self.index.get(row)
+        if i is None or i in self._dead:
+            return default
+        values = self.columns.get(col)
+        if values is None or values[i] is None:
+            return default
+        return values[i]
+
+    def row(self, row: str) -> Optional[Dict[str, Any]]:
+        i = self.index.get(row)
+        if i is None or i in self._dead:
+            return None
+        return {c: v[i] for c, v in self.columns.items() if v[i] is not None}
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {r: self.row(r) for r in self.rows if self.index[r] not in self._dead}
+
+    # ---- 保存形式 ----
+    def dump(self) -> dict:
+        self.compact()
+        return {"kind": self.kind, "rows": self.rows, "columns": self.columns}
+
+    @classmethod
+    def from_dump(cls, d: dict) -> "TableState":
+        t = cls(d.get("kind", ""))
+        t.rows = list(d.get("rows", []))
+        t.index = {r: i for i, r in enumerate(t.rows)}
+        t.columns = {c: list(v) for c, v in d.get("columns", {}).items()}
+        return t
+
+def apply_event(state: TableState, e: dict) -> None:
+    """
+    parse_hotfix のイベント 1 件をテーブル状態に適用する。
+    RowUpdate: DataTable は row;列;値、CurveTable は row;キー(時刻);値 → どちらも 列=値 として保持。
+    値は parse_ue_value で AddRow / TableUpdate と同じ型にそろえる。
+    """
+    op = e["op"]
+    if op == "RowUpdate":
+        col, _, value = (e.get("rest") or "").partition(";")
+        if col:
+            state.set(e["row"], col, parse_ue_value(value))
+    elif op in ADD_OPS:
+        row = _decode_json_payload(e["raw"])
+        if isinstance(row, dict) and "Name" in row:
+            values = {k: v for k, v in row.items() if k != "Name"}
+            state.put_row(str(row["Name"]), values)
+    elif op in REMOVE_OPS:
+        state.remove(e["row"])
+    elif op == "TableUpdate":
+        # TableUpdate はテーブル全体の置き換え
+        rows = _decode_json_payload(e["raw"])
+        state.clear()
+        for row in rows if isinstance(rows, list) else []:
+            if isinstance(row, dict) and "Name" in row:
+                state.put_row(str(row["Name"]), {k: v for k, v in row.items() if k != "Name"})
+
+class Materializer:
+    """
+    Hotfix の op 列を適用した「テーブル → 行 → 列 → 値」の状態を保持する。
+    update() は op 列が変わったテーブルだけを再構築する（差分更新）。
+
+    例（ルートのスクリプトから）:
+        m = Materializer.load("materialized_tables.json")
+        m.get("BlastBerryLootPackages", "WorldList.Foo.01", "Weight")
+        m.table("BlastBerryLootPackages")   # {row: {col: value}}
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, TableState] = {}
+        self.digests: Dict[str, str] = {}
+
+    def update(self, events: Iterable[dict]) -> List[str]:
+        """イベント全体を受け取り、内容が変わったテーブル名を返す"""
+        by_table: Dict[str, List[dict]] = {}
+        for e in events:
+            by_table.setdefault(e["table"], []).append(e)
+
+        changed = []
+        for table, evs in by_table.items():
+            h = hashlib.sha256(VALUE_FORMAT.encode("ascii") + b"\n")
+            for e in evs:
+                h.update(e["raw"].encode("utf-8"))
+                h.update(b"\n")
+            digest = h.hexdigest()
+            if self.digests.get(table) == digest:
+                continue
+            # 同じテーブル内の op は順序依存なので、そのテーブルだけ最初から再生する
+            state = TableState(evs[0].get("kind", ""))
+            for e in evs:
+                try:
+                    apply_event(state, e)
+                except ValueError as ex:
+                    print(f"[WARN] materialize: {table} {e['op']} {e['row']} を解釈できません: {ex}", flush=True)
+            state.compact()
+            self.tables[table] = state
+            self.digests[table] = digest
+            changed.append(table)
+
+        for table in [t for t in self.tables if t not in by_table]:
+            del self.tables[table]
+            self.digests.pop(table, None)
+            changed.append(table)
+        return sorted(changed)
+
+    # ---- 読み出し ----
+    def get(self, table: str, row: str, col: str, default: Any = None) -> Any:
+        t = self.tables.get(table)
+        return default if t is None else t.get(row, col, default)
+
+    def row(self, table: str, row: str) -> Optional[Dict[str, Any]]:
+        t = self.tables.get(table)
+        return None if t is None else t.row(row)
+
+    def table(self, table: str) -> Dict[str, Dict[str, Any]]:
+        t = self.tables.get(table)
+        return {} if t is None else t.to_dict()
+
+    # ---- 保存 ----
+    def save(self, path: str) -> None:
+        data = {
+            name: dict(t.dump(), digest=self.digests.get(name, ""))
+            for name, t in self.tables.items()
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Materializer":
+        m = cls()
+        if not os.path.exists(path):
+            return m
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for name, d in data.items():
+            m.tables[name] = TableState.from_dump(d)
+            m.digests[name] = d.get("digest", "")
+        return m
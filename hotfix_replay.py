@@ -0,0 +1,148 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from watch_and_update import iter_hotfix_events, load_cfg, plan_groups
+
+# ===== スナップショットの読み出し =====
+def iter_dir_snapshots(path: str, pattern: str = "*.ini") -> Iterator[Tuple[str, float, str]]:
+    """フォルダ内のファイルを名前順に (ラベル, 時刻, 本文) で返す"""
+    for p in sorted(glob.glob(os.path.join(path, pattern))):
+        with open(p, "r", encoding="utf-8", errors="ignore") as f:
+            yield os.path.basename(p), os.path.getmtime(p), f.read()
+
+def iter_git_snapshots(repo: str, path: str) -> Iterator[Tuple[str, float, str]]:
+    """
+    repo の path の履歴を古い順に返す。
+    git cat-file --batch を 1 本だけ起動して全版を流し込む（版ごとに git を起動しない）。
+    """
+    p = subprocess.run(["git", "log", "--reverse", "--format=%H %ct", "--", path],
+                       cwd=repo, text=True, capture_output=True)
+    if p.returncode != 0:
+        raise RuntimeError(f"git log 失敗: {p.stderr.strip()}")
+    commits = [ln.split() for ln in p.stdout.splitlines() if ln.strip()]
+    if not commits:
+        return
+
+    cat = subprocess.Popen(["git", "cat-file", "--batch"], cwd=repo,
+                           stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        for sha, ct in commits:
+            cat.stdin.write(f"{sha}:{path}\n".encode("utf-8"))
+            cat.stdin.flush()
+            header = cat.stdout.readline().decode("utf-8").split()
+            if len(header) < 3 or header[1] == "missing":
+                continue  # その版では削除されていた
+            size = int(header[2])
+            body = cat.stdout.read(size)
+            cat.stdout.read(1)  # 末尾の改行
+            yield sha[:10], float(ct), body.decode("utf-8", errors="ignore")
+    finally:
+        cat.stdin.close()
+        cat.wait()
+
+# ===== 解析（前のスナップショットの結果を使い回す） =====
+class ReplayState:
+    """
+    直前スナップショットの「行 → イベント」と「テーブル → 行集合」を保持する。
+    連続するスナップショットはほとんど同じ行なので、既知の行は正規表現にかけ直さない。
+    """
+
+    def __init__(self):
+        self.line_cache: Dict[str, Optional[dict]] = {}
+        self.tables: Dict[str, frozenset] = {}
+
+    def step(self, text: str) -> Tuple[List[str], List[dict]]:
+        """本文を取り込み、(変更テーブル, 変更テーブルのイベント) を返す"""
+        cache: Dict[str, Optional[dict]] = {}
+        old_cache = self.line_cache
+        by_table: Dict[str, List[dict]] = {}
+        for raw in text.splitlines():
+            s = raw.strip()
+            if s in cache:
+                e = cache[s]
+            elif s in old_cache:
+                e = cache[s] = old_cache[s]
+            else:
+                e = cache[s] = next(iter_hotfix_events((s,)), None)
+            if e is not None:
+                by_table.setdefault(e["table"], []).append(e)
+
+        new_tables = {t: frozenset(e["raw"] for e in evs) for t, evs in by_table.items()}
+        # Hotfix取得.py と同じ判定：新側にあり、旧側と行集合が異なるテーブル
+        changed = sorted(t for t, lines in new_tables.items() if self.tables.get(t) != lines)
+        events = [e for t in changed for e in by_table[t]]
+
+        self.line_cache = cache
+        self.tables = new_tables
+        return changed, events
+
+def replay(cfg: dict, snapshots, include_first: bool = False) -> List[dict]:
+    state = ReplayState()
+    report = []
+    first = True
+    for label, ts, text in snapshots:
+        changed, events = state.step(text)
+        if first and not include_first:
+            first = False
+            continue
+        first = False
+        if not changed:
+            continue
+        fired = [name for name, _gdef, _matched in plan_groups(cfg, events)]
+        report.append({"snapshot": label, "ts": ts, "changed_tables": changed, "groups": fired})
+    return report
+
+def main():
+    ap = argparse.ArgumentParser(description="過去の Hotfix.ini を流してルールの発火を確認する（コマンドは実行しない）")
+    ap.add_argument("--config", default="hotfix_rules.yaml")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--dir", help="Hotfix.ini スナップショットのフォルダ（名前順に再生）")
+    src.add_argument("--git", help="Hotfix.ini を管理している git リポジトリ（履歴を古い順に再生）")
+    ap.add_argument("--pattern", default="*.ini", help="--dir 時のファイルパターン（既定: *.ini）")
+    ap.add_argument("--path", default="Hotfix.ini", help="--git 時のリポジトリ内パス（既定: Hotfix.ini）")
+    ap.add_argument("--include-first", action="store_true",
+                    help="最初のスナップショットも（空との差分として）判定する")
+    ap.add_argument("--json-out", default=None, help="結果を JSON で書き出すパス")
+    args = ap.parse_args()
+
+    cfg = load_cfg(args.config)
+    if args.dir:
+        snapshots = iter_dir_snapshots(args.dir, args.pattern)
+    else:
+        snapshots = iter_git_snapshots(args.git, args.path)
+
+    count = 0
+    def counted(it):
+        nonlocal count
+        for x in it:
+            count += 1
+            yield x
+
+    t0 = time.perf_counter()
+    report = replay(cfg, counted(snapshots), include_first=args.include_first)
+    elapsed = time.perf_counter() - t0
+
+    totals = Counter()
+    for r in report:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["ts"]))
+        groups = ", ".join(r["groups"]) or "(なし)"
+        print(f"[{when}] {r['snapshot']}: {groups}  <- {', '.join(r['changed_tables'])}")
+        totals.update(r["groups"])
+
+    rate = count / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"\n{count} スナップショット / {elapsed:.2f}s ({rate:.0f} 件/分)")
+    for name, n in totals.most_common():
+        print(f"  {name}: {n} 回")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+import heapq
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Hotfix.ini のテーブル行（+DataTable= / +CurveTable= ...）からテーブルパスを拾う
+LINE_RE_TABLE = re.compile(r"^[+\-]?[A-Za-z]*Table=([^;]+);")
+
+CHUNK_SIZE = 1 << 20          # 読み込み 1 回あたりのバイト数
+DEFAULT_MEM_CAP = 64 << 20    # ソート用バッファの上限（バイト）
+MAX_FAN_IN = 64               # 1 回の併合で同時に開くランファイル数の上限（Windows は FD 上限が低い）
+
+def iter_lines(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    ファイルを chunk_size ずつ読み、行単位で返すジェネレータ。
+    1 行がどれだけ長くても、保持するのは「読みかけの行 + 1 チャンク」だけ。
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        pending = ""
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            lines = (pending + chunk).split("\n")
+            # 最後の要素は読みかけの行なので次のチャンクへ持ち越す
+            pending = lines.pop()
+            for ln in lines:
+                yield ln
+        if pending:
+            yield pending
+
+def iter_table_lines(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """(テーブル basename, 行) を返す。テーブル行以外は読み飛ばす"""
+    for raw in lines:
+        s = raw.strip()
+        m = LINE_RE_TABLE.match(s)
+        if m:
+            base = os.path.splitext(os.path.basename(m.group(1)))[0]
+            yield base, s
+
+def _write_run(buf: List[str], tmpdir: str) -> str:
+    buf.sort()
+    fd, path = tempfile.mkstemp(prefix="hfrun_", suffix=".txt", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+        for rec in buf:
+            f.write(rec + "\n")
+    return path
+
+def _iter_run(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        for ln in f:
+            yield ln.rstrip("\n")
+
+def _merge_runs(paths: List[str], tmpdir: Optional[str]) -> str:
+    """複数のランを 1 本のランに併合（重複は除く）し、元のランは消す"""
+    fd, out = tempfile.mkstemp(prefix="hfrun_", suffix=".txt", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+        prev = None
+        for rec in heapq.merge(*(_iter_run(p) for p in paths)):
+            if rec != prev:
+                f.write(rec + "\n")
+                prev = rec
+    for p in paths:
+        os.remove(p)
+    return out
+
+def external_sorted_unique(records: Iterable[str], mem_cap: int = DEFAULT_MEM_CAP,
+                           tmpdir: Optional[str] = None, fan_in: int = MAX_FAN_IN) -> Iterator[str]:
+    """
+    外部ソート（sort-merge）。mem_cap バイトごとにソート済みランを一時ファイルへ書き出し、
+    heapq.merge で併合しながら重複を取り除いて返す。
+    ランが fan_in 本を超える場合は fan_in 本ずつ中間ランに併合してから最終併合する（多段併合）。
+    """
+    fan_in = max(2, fan_in)
+    runs: List[str] = []
+    buf: List[str] = []
+    size = 0
+    try:
+        for rec in records:
+            buf.append(rec)
+            size += len(rec) + 64  # 文字列オブジェクトのオーバーヘッド分を大まかに加算
+            if size >= mem_cap:
+                runs.append(_write_run(buf, tmpdir))
+                buf, size = [], 0
+
+        if not runs:
+            # 上限に収まったならディスクを使わずそのまま
+            buf.sort()
+            merged: Iterable[str] = buf
+        else:
+            if buf:
+                runs.append(_write_run(buf, tmpdir))
+                buf = []
+            while len(runs) > fan_in:
+                # runs はここで入れ替えるので、途中で失敗しても finally で残りを消せる
+                batch, runs = runs[:fan_in], runs[fan_in:]
+                try:
+                    runs.append(_merge_runs(batch, tmpdir))
+                except BaseException:
+                    runs.extend(batch)
+                    raise
+            merged = heapq.merge(*(_iter_run(p) for p in runs))
+
+        prev = None
+        for rec in merged:
+            if rec != prev:
+                yield rec
+                prev = rec
+    finally:
+        for p in runs:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+def table_digests(path: str, mem_cap: int = DEFAULT_MEM_CAP,
+                  tmpdir: Optional[str] = None) -> Dict[str, str]:
+    """
+    テーブルごとに「重複排除・ソート済み行集合」の sha256 を計算する。
+    集合そのものは保持しないので、メモリは mem_cap + テーブル数分で頭打ちになる。
+    """
+    records = (f"{t}\t{s}" for t, s in iter_table_lines(iter_lines(path)))
+    digests: Dict[str, str] = {}
+    cur_table = None
+    h = None
+    for rec in external_sorted_unique(records, mem_cap, tmpdir):
+        table, _, line = rec.partition("\t")
+        if table != cur_table:
+            if cur_table is not None:
+                digests[cur_table] = h.hexdigest()
+            cur_table = table
+            h = hashlib.sha256()
+        h.update(line.encode("utf-8"))
+        h.update(b"\n")
+    if cur_table is not None:
+        digests[cur_table] = h.hexdigest()
+    return digests
+
+def changed_tables_streaming(old_path: Optional[str], new_path: str,
+                             mem_cap: int = DEFAULT_MEM_CAP,
+                             tmpdir: Optional[str] = None) -> List[str]:
+    """
+    新旧 Hotfix.ini を全量読み込みせずに比較し、内容が変わったテーブル名を返す。
+    （新側に存在し、旧側と行集合が異なるテーブル = 従来のセット比較と同じ判定）
+    """
+    new_d = table_digests(new_path, mem_cap, tmpdir)
+    old_d: Dict[str, str] = {}
+    if old_path and os.path.exists(old_path):
+        old_d = table_digests(old_path, mem_cap, tmpdir)
+    return sorted(t for t, d in new_d.items() if old_d.get(t) != d)
@@ -32,16 +32,17 @@ def token_client():
         print("token_client: レスポンス (JSON整形出力):\n" + json.dumps(response_json, indent=4, ensure_ascii=False))
         if response.status_code != 200:
             print(f"token_client: エラー - ステータスコード: {response.status_code}, 理由: {response.reason}")
-            return None
-        return response_json.get("access_token")
+            return None, None
+        return response_json.get("access_token"), response_json.get("expires_at")
     except Exception as e:
         print(f"token_client: エラーが発生しました: {e}")
-        return None
+        return None, None
 if __name__ == "__main__":
     print("メイン処理: 各トークンの取得を開始します")
-    client_token = token_client()
+    client_token, expires_at = token_client()
     tokens = {
         "client_token": client_token,
+        "client_token_expires_at": expires_at,  # hotfix_auto の /health で表示
     }
     save_tokens(tokens)
 
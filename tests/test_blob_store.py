@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from blob_store import REFS_FILE, BlobStore
+
+def _age(store, sha, seconds):
+    path = store._find_object(sha)
+    t = os.path.getmtime(path) - seconds
+    os.utime(path, (t, t))
+
+def test_same_content_is_stored_once_across_names(tmp_path):
+    store = BlobStore(str(tmp_path), codec="gzip")
+    a = store.put("a", b"same body")
+    b = store.put("b", b"same body")
+    assert a == b
+    assert len(list(store._iter_objects())) == 1
+    assert store.latest("a") == store.latest("b") == a
+    # 直前と同じ中身なら ref も増えない
+    store.put("a", b"same body")
+    assert len(store.history("a")) == 1
+
+def test_age_eviction_keeps_latest_version(tmp_path):
+    store = BlobStore(str(tmp_path), codec="gzip")
+    old = store.put("a", b"v1")
+    new = store.put("a", b"v2")
+    _age(store, old, 3600)
+    _age(store, new, 3600)
+    assert store.evict(max_age_sec=60) == 1
+    assert not store.has(old) and store.has(new)
+
+def test_size_eviction_keeps_latest_versions_and_prunes_refs(tmp_path):
+    store = BlobStore(str(tmp_path), codec="gzip")
+    v1 = store.put("a", b"v1" * 100)
+    store.put("b", b"other")
+    v2 = store.put("a", b"v2" * 100)
+    assert store.evict(max_bytes=0) == 1
+    assert not store.has(v1) and store.has(v2)
+
+    # refs.jsonl からも消えていて、読み直しても同じ
+    assert [r["sha"] for r in store.history("a")] == [v2]
+    reopened = BlobStore(str(tmp_path), codec="gzip")
+    assert [r["sha"] for r in reopened.history("a")] == [v2]
+    assert reopened.latest("b") is not None
+
+def test_evict_skips_malformed_refs(tmp_path):
+    store = BlobStore(str(tmp_path), codec="gzip")
+    store.put("a", b"v1")
+    with open(os.path.join(str(tmp_path), REFS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"name": "x"}) + "\n")
+        f.write("not json\n")
+    reopened = BlobStore(str(tmp_path), codec="gzip")
+    assert reopened.evict(max_bytes=0) == 0
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_open_text_streams_both_codecs(tmp_path, codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    store = BlobStore(str(tmp_path), codec=codec)
+    text = "[AssetHotfix]\n+DataTable=/Game/A;RowUpdate;R;C;1\n" * 50
+    sha = store.put("a", text.encode("utf-8"))
+    with store.open_text(sha) as f:
+        assert f.read() == text
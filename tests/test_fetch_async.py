@@ -0,0 +1,69 @@
+import asyncio
+import importlib
+import time
+
+fetcher = importlib.import_module("Hotfix取得")
+
+BODY = b"[AssetHotfix]\n+DataTable=/Game/DT/Foo;RowUpdate;Row;Weight;1.0\n"
+
+def fake_http(delays, statuses=None, active=None):
+    """unique ごとに delays 秒待って返す _http_get_async の代わり"""
+    statuses = statuses or {}
+
+    async def get(url, headers, timeout, session=None):
+        unique = url.rsplit("/", 1)[-1]
+        if active is not None:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        try:
+            await asyncio.sleep(delays.get(unique, 0))
+        finally:
+            if active is not None:
+                active["now"] -= 1
+        return statuses.get(unique, 200), BODY, {"Content-Type": "text/plain"}, "OK"
+    return get
+
+def run(targets, outdir, **kw):
+    return asyncio.run(fetcher.fetch_all_async("token", targets, str(outdir), **kw))
+
+def test_deadline_cancels_slow_targets_and_uses_previous_copy(tmp_path, monkeypatch):
+    (tmp_path / "slow.ini").write_text("[AssetHotfix]\n; previous\n", encoding="utf-8")
+    monkeypatch.setattr(fetcher, "_http_get_async", fake_http({"slow": 30}))
+
+    t0 = time.monotonic()
+    results, stale, unauthorized = run(["fast", "slow"], tmp_path, request_timeout=60, cycle_deadline=0.3)
+    assert time.monotonic() - t0 < 2
+
+    assert stale == ["slow"] and unauthorized == []
+    assert results["fast"]["type"] == "ini" and "stale" not in results["fast"]
+    assert results["slow"] == {"type": "ini", "raw": "[AssetHotfix]\n; previous\n", "stale": True}
+
+def test_request_timeout_without_previous_copy_is_reported_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "_http_get_async", fake_http({"slow": 30}))
+    results, stale, _ = run(["fast", "slow"], tmp_path, request_timeout=0.1, cycle_deadline=10)
+    assert stale == ["slow"]
+    assert "slow" not in results and "fast" in results
+
+def test_unauthorized_targets_are_returned_for_retry(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "_http_get_async", fake_http({}, statuses={"a": 401}))
+    results, stale, unauthorized = run(["a", "b"], tmp_path)
+    assert unauthorized == ["a"] and stale == []
+    assert list(results) == ["b"]
+
+def test_concurrency_is_capped(tmp_path, monkeypatch):
+    active = {"now": 0, "peak": 0}
+    targets = [f"u{i}" for i in range(12)]
+    monkeypatch.setattr(fetcher, "_http_get_async", fake_http({u: 0.05 for u in targets}, active=active))
+    results, stale, _ = run(targets, tmp_path, max_concurrency=3)
+    assert active["peak"] == 3
+    assert len(results) == 12 and stale == []
+
+def test_previous_section_is_read_from_hotfix_ini(tmp_path):
+    hotfix = tmp_path / "Hotfix.ini"
+    hotfix.write_text(
+        "; ===== a =====\n[AssetHotfix]\n+DataTable=/Game/A;RowUpdate;R;C;1\n\n"
+        "; ===== b =====\n[AssetHotfix]\n+DataTable=/Game/B;RowUpdate;R;C;2\n\n",
+        encoding="utf-8")
+    assert fetcher.load_previous_section(str(hotfix), "b") == {
+        "type": "ini", "raw": "[AssetHotfix]\n+DataTable=/Game/B;RowUpdate;R;C;2", "stale": True}
+    assert fetcher.load_previous_section(str(hotfix), "c") is None
@@ -0,0 +1,73 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時に読み込んではいけない重いモジュール（実際の取得時まで遅延 import する）
+HEAVY_MODULES = ("requests", "aiohttp", "urllib3")
+IMPORT_BUDGET_US = 150_000  # Hotfix取得 の import 全体（累積）にかけてよい時間
+
+def test_import_is_lazy_and_fast():
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import Hotfix取得"],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8",
+    )
+    assert p.returncode == 0, p.stderr
+
+    # 行の形式: "import time:   self [us] | cumulative | name"
+    rows = {}
+    for ln in p.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", ln)
+        if m:
+            rows[m.group(4)] = int(m.group(2))
+
+    imported = {name.split(".")[0] for name in rows}
+    for mod in HEAVY_MODULES:
+        assert mod not in imported, f"{mod} が起動時に import されている"
+
+    assert "Hotfix取得" in rows
+    assert rows["Hotfix取得"] < IMPORT_BUDGET_US, f"import に {rows['Hotfix取得']}us かかった"
+
+def test_precheck_does_not_download_changed_body(tmp_path, monkeypatch):
+    import http.client
+    import http.server
+    import importlib
+    import json
+    import threading
+
+    fetcher = importlib.import_module("Hotfix取得")
+    body_size = 64 << 20
+    sent = [0]
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(body_size))
+            self.send_header("ETag", '"new"')
+            self.end_headers()
+            try:
+                for _ in range(body_size >> 16):
+                    self.wfile.write(b"x" * 65536)
+                    sent[0] += 65536
+            except OSError:
+                pass  # クライアントが閉じた
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    monkeypatch.setattr(http.client, "HTTPSConnection",
+                        lambda host, timeout=None: http.client.HTTPConnection("127.0.0.1", port, timeout=timeout))
+    (tmp_path / fetcher.VALIDATORS_FILE).write_text(json.dumps({"a": {"etag": '"old"'}}), encoding="utf-8")
+    try:
+        assert fetcher.precheck_unchanged("token", ["a"], str(tmp_path), timeout=5) is False
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert sent[0] < body_size // 2
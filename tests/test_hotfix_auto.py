@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("requests")  # hotfix_auto は Discord 通知に requests を使う
+
+import hotfix_auto as auto
+
+@pytest.fixture
+def quiet(monkeypatch):
+    posted = []
+    monkeypatch.setattr(auto, "_post_discord", lambda content, mandatory=False: posted.append(content))
+    monkeypatch.setattr(auto, "METRICS_FILE", None)
+    return posted
+
+def test_groups_publish_own_paths_and_the_rest_is_deferred(monkeypatch, quiet):
+    pushed = []
+    monkeypatch.setattr(auto, "git_has_changes", lambda repo, paths: True)
+    monkeypatch.setattr(auto, "git_commit_and_push",
+                        lambda repo, paths, msg: pushed.append(list(paths)) or True)
+    cfg = {"groups": [{"name": "BR", "publish_paths": ["BR/"]}, {"name": "Nobuild"}, {"name": "Figment"}]}
+    on_group_done, publish_deferred = auto.make_publisher(["T"], auto.time.time(), cfg)
+
+    on_group_done("Nobuild", 0)
+    on_group_done("BR", 0)
+    on_group_done("Figment", 1)
+    assert pushed == [["BR/"]]
+    assert not any("Nobuild 反映完了" in m for m in quiet)
+
+    publish_deferred()
+    assert pushed == [["BR/"], auto.GIT_INCLUDE_PATHS + [":(exclude)BR/"]]
+    assert any("Nobuild 反映完了" in m for m in quiet)
+
+@pytest.fixture
+def control(tmp_path, monkeypatch, quiet):
+    import http.client
+    import json
+
+    cfg = tmp_path / "rules.yaml"
+    cfg.write_text("groups:\n  - name: BR\n  - name: Reload\n", encoding="utf-8")
+    monkeypatch.setattr(auto, "WATCH_CONFIG", str(cfg))
+    monkeypatch.setattr(auto, "PAUSED_GROUPS", set())
+    monkeypatch.setattr(auto, "SKIPPED_CHANGES", {})
+    monkeypatch.setattr(auto, "TOKENS_JSON_FILE", str(tmp_path / "none.json"))
+    reruns = []
+    monkeypatch.setattr(auto, "resume_skipped", reruns.append)
+    server = auto.start_control_server(port=0)
+    port = server.server_address[1]
+
+    def request(method, path, headers=None):
+        headers = dict({auto.CONTROL_HEADER: "1"}, **(headers or {}))
+        headers = {k: v for k, v in headers.items() if v is not None}  # None はヘッダーを送らない
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            conn.request(method, path, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, json.loads(resp.read())
+        finally:
+            conn.close()
+
+    request.reruns = reruns
+    yield request
+    server.shutdown()
+    server.server_close()
+
+def test_control_rejects_foreign_origin_host_and_missing_header(control):
+    assert control("POST", "/pause?group=*", {"Origin": "https://evil.example"})[0] == 403
+    assert control("POST", "/pause?group=*", {"Host": "evil.example:8765"})[0] == 403
+    assert control("GET", "/health", {"Host": "rebind.example"})[0] == 403
+    assert control("POST", "/pause?group=*", {auto.CONTROL_HEADER: None})[0] == 403
+    assert auto.PAUSED_GROUPS == set()
+    assert control("POST", "/pause?group=BR", {"Origin": "http://localhost:8765"})[0] == 200
+
+def test_control_token_must_match(control, monkeypatch):
+    monkeypatch.setattr(auto, "CONTROL_TOKEN", "secret")
+    assert control("POST", "/poll-now")[0] == 403
+    assert control("POST", "/poll-now", {auto.CONTROL_HEADER: "secret"})[0] == 200
+    assert auto.POLL_NOW.is_set()
+    auto.POLL_NOW.clear()
+
+def test_pause_resume_and_skipped_changes(control):
+    assert control("POST", "/pause?group=Nope")[0] == 404
+    assert control("POST", "/pause")[0] == 200
+    assert control("POST", "/resume?group=BR")[0] == 409
+
+    auto.record_skipped("BR", ["T1"])
+    status, h = control("GET", "/health")
+    assert status == 200 and h["paused_groups"] == ["*"] and h["skipped_changes"] == {"BR": ["T1"]}
+
+    status, body = control("POST", "/resume")
+    assert status == 200 and body["paused_groups"] == [] and body["rerun"] == {"BR": ["T1"]}
+    auto.DOWNSTREAM.submit(lambda: None).result(5)  # 再実行の投入を待つ
+    assert control.reruns == [{"BR": {"T1"}}]
+    assert control("GET", "/health")[1]["skipped_changes"] == {}
@@ -0,0 +1,56 @@
+import json
+
+from hotfix_materialize import Materializer, TableState, parse_ue_value
+from watch_and_update import parse_hotfix
+
+def test_remove_then_update_drops_old_columns():
+    t = TableState()
+    t.set("r", "a", "1")
+    t.set("r", "b", "2")
+    t.remove("r")
+    assert t.row("r") is None
+    t.set("r", "a", "9")
+    assert t.row("r") == {"a": "9"}
+
+def test_replay_and_incremental_update(tmp_path):
+    payload = json.dumps(json.dumps({"Name": "Pkg.02", "Weight": 0.5}))
+    text = "\n".join([
+        "+DataTable=/Game/DT/LootPackages;RowUpdate;Pkg.01;Weight;1.0",
+        "+DataTable=/Game/DT/LootPackages;RowUpdate;Pkg.01;Count;3",
+        f"+DataTable=/Game/DT/LootPackages;AddRow;{payload}",
+        "+DataTable=/Game/DT/LootPackages;RowRemove;Pkg.01",
+        "+DataTable=/Game/DT/LootPackages;RowUpdate;Pkg.01;Weight;2.0",
+        "+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.5",
+    ])
+    m = Materializer()
+    assert m.update(parse_hotfix(text)) == ["GameData", "LootPackages"]
+    assert m.table("LootPackages") == {"Pkg.01": {"Weight": 2.0}, "Pkg.02": {"Weight": 0.5}}
+    assert m.get("GameData", "Default.Tick", "0.0") == 0.5
+
+    # 変わっていないテーブルは再構築しない
+    text2 = text + "\n+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;1.0;0.7"
+    assert m.update(parse_hotfix(text2)) == ["GameData"]
+
+    path = str(tmp_path / "mt.json")
+    m.save(path)
+    m2 = Materializer.load(path)
+    assert m2.table("LootPackages") == m.table("LootPackages")
+    assert m2.row("GameData", "Default.Tick") == {"0.0": 0.5, "1.0": 0.7}
+
+def test_row_update_values_match_add_row_types():
+    assert parse_ue_value("3") == 3
+    assert parse_ue_value("1.000000") == 1.0
+    assert parse_ue_value("(X=3,Y=3)") == {"X": 3, "Y": 3}
+    assert parse_ue_value("(1,0,0)") == [1, 0, 0]
+    assert parse_ue_value("/Game/Items/Ammo.Ammo") == "/Game/Items/Ammo.Ammo"
+
+    payload = json.dumps(json.dumps({"Name": "Pkg.02", "Weight": 1, "CountRange": {"X": 2, "Y": 2}}))
+    text = "\n".join([
+        f"+DataTable=/Game/DT/LootPackages;AddRow;{payload}",
+        "+DataTable=/Game/DT/LootPackages;RowUpdate;Pkg.01;Weight;4",
+        "+DataTable=/Game/DT/LootPackages;RowUpdate;Pkg.01;CountRange;(X=3,Y=3)",
+    ])
+    m = Materializer()
+    m.update(parse_hotfix(text))
+    for col in ("Weight", "CountRange"):
+        assert type(m.get("LootPackages", "Pkg.01", col)) is type(m.get("LootPackages", "Pkg.02", col))
@@ -0,0 +1,50 @@
+import hotfix_stream
+from hotfix_replay import ReplayState, replay
+from watch_and_update import iter_hotfix_events, plan_groups
+
+CFG = {
+    "groups": [
+        {"name": "Reload", "match": {"method": "regex", "tables": ["BlastBerry"]}, "ops": ["RowUpdate", "RowRemove"]},
+        {"name": "Curves", "match": {"method": "regex", "tables": ["GameData"]}, "ops": ["RowUpdate"]},
+    ],
+}
+
+BASE = [
+    "[AssetHotfix]",
+    "+DataTable=/Game/DT/BlastBerryLootPackages;RowUpdate;Pkg.01;Weight;1.0",
+    "+DataTable=/Game/DT/BlastBerryLootTiers;RowUpdate;Tier.01;Weight;1.0",
+    "+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.5",
+]
+SNAPSHOTS = [
+    BASE,
+    BASE,                                                                   # 変化なし
+    BASE[:3] + ["+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.7"],
+    BASE + ["+DataTable=/Game/DT/BlastBerryLootPackages;RowRemove;Pkg.02"],
+    BASE[:2] + BASE[3:],                                                    # テーブルが消えた
+]
+
+def test_cached_step_matches_stream_diff_and_plan_groups(tmp_path):
+    state = ReplayState()
+    prev_path = None
+    for i, lines in enumerate(SNAPSHOTS):
+        path = tmp_path / f"{i:02d}.ini"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        changed, events = state.step(path.read_text(encoding="utf-8"))
+
+        expected = hotfix_stream.changed_tables_streaming(prev_path, str(path))
+        expected_events = [e for e in iter_hotfix_events(lines) if e["table"] in expected]
+        assert changed == expected
+        assert [g[0] for g in plan_groups(CFG, events)] == [g[0] for g in plan_groups(CFG, expected_events)]
+        prev_path = str(path)
+
+def test_replay_reports_fired_groups_per_snapshot():
+    snaps = [(f"s{i}", float(i), "\n".join(lines)) for i, lines in enumerate(SNAPSHOTS)]
+    report = replay(CFG, snaps)
+    # s3 は GameData を 0.5 に戻し、s4 は RowRemove 行と BlastBerryLootTiers が消える
+    assert [(r["snapshot"], r["changed_tables"]) for r in report] == [
+        ("s2", ["GameData"]),
+        ("s3", ["BlastBerryLootPackages", "GameData"]),
+        ("s4", ["BlastBerryLootPackages"]),
+    ]
+    assert [r["groups"] for r in report] == [["Curves"], ["Reload", "Curves"], ["Reload"]]
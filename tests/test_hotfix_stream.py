@@ -0,0 +1,113 @@
+import collections
+import os
+import tracemalloc
+
+import pytest
+
+import hotfix_stream
+
+N_TABLES = 200
+
+def _line(t, i, val="1"):
+    return f"+DataTable=/Game/DataTables/Table{t:03d};RowUpdate;Row.{i:08d};Weight;{val}\n"
+
+def write_pair(tmp_path, target_bytes):
+    """
+    共通部分が target_bytes 程度の新旧 INI を作り、期待される変更テーブルを返す。
+      Table007 … 新側に行追加
+      Table042 … 値の変更
+      Table099 … 旧側にだけある行
+      Table003 … 新側で同じ行が重複（集合としては変化なし）
+      Table005 … 新側で行順だけ違う（変化なし）
+      OnlyOld  … 旧側だけのテーブル（報告しない）
+      OnlyNew  … 新側だけのテーブル（CurveTable）
+    """
+    old_p, new_p = tmp_path / "old.ini", tmp_path / "new.ini"
+    block = "".join(_line(t, i) for i in range(50) for t in range(N_TABLES))
+    reps = max(1, target_bytes // len(block))
+    with open(old_p, "w", encoding="utf-8") as fo, open(new_p, "w", encoding="utf-8") as fn:
+        for f in (fo, fn):
+            f.write("[/Script/FortniteGame.FortGameInstance]\nbBattleRoyaleMatchmakingEnabled=true\n")
+        for r in range(reps):
+            # ブロックごとに行名をずらし、全体として行数が増えるようにする
+            chunk = block.replace("Row.", f"Row.{r:05d}.")
+            fo.write(chunk)
+            fn.write(chunk)
+        fo.write(_line(42, 1, "old") + _line(99, 7) + _line(3, 0) + _line(5, 1) + _line(5, 2))
+        fo.write("+DataTable=/Game/DataTables/OnlyOld;RowUpdate;a;b;c\n")
+        fn.write(_line(7, 123456789) + _line(42, 1, "new") + _line(3, 0) + _line(3, 0))
+        fn.write(_line(5, 2) + _line(5, 1))
+        fn.write("+CurveTable=/Game/Curves/OnlyNew;RowUpdate;a;0.0;1.0\n")
+    expected = ["OnlyNew", "Table007", "Table042", "Table099"]
+    return str(old_p), str(new_p), expected
+
+def in_memory_changed(old_p, new_p):
+    # Hotfix取得.py の従来経路と同じ「テーブルごとの行集合」比較
+    def load(p):
+        m = collections.defaultdict(set)
+        with open(p, "r", encoding="utf-8", errors="ignore") as f:
+            for base, s in hotfix_stream.iter_table_lines(ln.rstrip("\n") for ln in f):
+                m[base].add(s)
+        return m
+    new_map = load(new_p)
+    old_map = load(old_p) if os.path.exists(old_p) else {}
+    return sorted(t for t in new_map if new_map[t] != old_map.get(t, set()))
+
+def run_streaming(old_p, new_p, mem_cap, tmpdir):
+    tracemalloc.start()
+    try:
+        got = hotfix_stream.changed_tables_streaming(old_p, new_p, mem_cap=mem_cap, tmpdir=tmpdir)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return got, peak
+
+def test_iter_lines_across_chunks(tmp_path):
+    p = tmp_path / "a.ini"
+    p.write_text("abc\ndefgh\r\n\nlast", encoding="utf-8")
+    assert list(hotfix_stream.iter_lines(str(p), chunk_size=2)) == ["abc", "defgh", "", "last"]
+
+def test_streaming_matches_in_memory_small(tmp_path):
+    old_p, new_p, expected = write_pair(tmp_path, 2 << 20)
+    # 上限を小さくしてランの書き出しと併合を必ず通す
+    got, _peak = run_streaming(old_p, new_p, mem_cap=256 << 10, tmpdir=str(tmp_path))
+    assert got == expected
+    assert got == in_memory_changed(old_p, new_p)
+    assert sorted(os.listdir(tmp_path)) == ["new.ini", "old.ini"]  # 一時ランは残らない
+
+def test_multi_pass_merge_limits_open_runs(tmp_path, monkeypatch):
+    records = [f"r{i % 997:04d}" for i in range(5000)]
+    opened, peak = [0], [0]
+    real_iter_run = hotfix_stream._iter_run
+
+    def counting_iter_run(path):
+        opened[0] += 1
+        peak[0] = max(peak[0], opened[0])
+        try:
+            yield from real_iter_run(path)
+        finally:
+            opened[0] -= 1
+
+    monkeypatch.setattr(hotfix_stream, "_iter_run", counting_iter_run)
+    got = list(hotfix_stream.external_sorted_unique(records, mem_cap=2000, tmpdir=str(tmp_path), fan_in=3))
+    assert got == sorted(set(records))
+    assert peak[0] <= 3
+    assert os.listdir(tmp_path) == []
+
+def test_missing_old_reports_all_tables(tmp_path):
+    _old_p, new_p, _expected = write_pair(tmp_path, 64 << 10)
+    got = hotfix_stream.changed_tables_streaming(None, new_p)
+    assert got == in_memory_changed(str(tmp_path / "missing.ini"), new_p)
+
+@pytest.mark.slow
+def test_streaming_500mb_bounded_memory(tmp_path):
+    mem_cap = 16 << 20
+    old_p, new_p, expected = write_pair(tmp_path, 500 << 20)
+    assert os.path.getsize(new_p) >= 500 << 20
+
+    got, peak = run_streaming(old_p, new_p, mem_cap, str(tmp_path))
+    assert got == expected
+    # バッファ上限 + 併合中の読み込みバッファ程度に収まること（ファイルサイズには比例しない）
+    assert peak < 3 * mem_cap, f"peak {peak >> 20} MB"
+
+    assert got == in_memory_changed(old_p, new_p)
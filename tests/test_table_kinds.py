@@ -0,0 +1,35 @@
+import hotfix_stream
+import watch_and_update as w
+
+LINES = [
+    "[AssetHotfix]",
+    "+DataTable=/Game/DT/BlastBerryLootPackages;RowUpdate;Pkg.01;Weight;1.0",
+    "+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.5",
+    "+CompositeTable=/Game/DT/Composite;RowUpdate;Row;Col;1",
+    "+TextReplacements=(Category=Game, Namespace=\"\", Key=\"k\")",
+]
+EVENTS = w.parse_hotfix("\n".join(LINES))
+
+def test_events_carry_kind():
+    assert [(e["kind"], e["table"]) for e in EVENTS] == [
+        ("DataTable", "BlastBerryLootPackages"),
+        ("CurveTable", "GameData"),
+        ("CompositeTable", "Composite"),
+    ]
+
+def test_diff_lines_include_every_table_kind():
+    assert [t for t, _line in hotfix_stream.iter_table_lines(LINES)] == [
+        "BlastBerryLootPackages", "GameData", "Composite"]
+
+def test_match_kinds():
+    curve = {"method": "regex", "tables": ["."], "kinds": ["CurveTable"]}
+    assert [e["table"] for e in w.filter_events(EVENTS, curve, ["RowUpdate"])] == ["GameData"]
+    # kinds 未指定なら全種別
+    assert len(w.filter_events(EVENTS, {"method": "regex", "tables": ["."]}, ["RowUpdate"])) == 3
+
+def test_plan_groups_respects_kinds():
+    cfg = {"groups": [
+        {"name": "Curves", "match": {"method": "regex", "tables": ["."], "kinds": ["CurveTable"]}, "ops": ["RowUpdate"]},
+        {"name": "Data", "match": {"method": "exact", "tables": ["GameData"], "kinds": ["DataTable"]}, "ops": ["RowUpdate"]},
+    ]}
+    assert [name for name, _g, _m in w.plan_groups(cfg, EVENTS)] == ["Curves"]
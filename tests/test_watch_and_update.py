@@ -0,0 +1,105 @@
+import sys
+
+import watch_and_update as w
+
+EVENTS = w.parse_hotfix("\n".join([
+    "+DataTable=/Game/DT/BlastBerryLootPackages;RowUpdate;Pkg.01;Weight;1.0",
+    "+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.5",
+]))
+
+def test_entrypoint_failure_falls_back_to_cmd(tmp_path):
+    (tmp_path / "ep_fail.py").write_text("def run(payload):\n    raise ValueError('boom')\n", encoding="utf-8")
+    gdef = {
+        "name": "Reload",
+        "entrypoint": "ep_fail:run",
+        "entrypoint_path": str(tmp_path),
+        "cmd": [sys.executable, "-c", "print('fallback ran')"],
+    }
+    cfg = {"workers": {"max": 1}}
+    try:
+        rc, out, _err = w.run_entrypoint(cfg, gdef, EVENTS, "Hotfix.ini")
+    finally:
+        if w._POOL is not None:
+            w._POOL.shutdown()
+            w._POOL = None
+    assert rc == 0
+    assert out == "fallback ran"
+
+def test_paused_groups_report_skipped_tables(tmp_path):
+    hotfix = tmp_path / "Hotfix.ini"
+    hotfix.write_text("\n".join([
+        "+DataTable=/Game/DT/BlastBerryLootPackages;RowUpdate;Pkg.01;Weight;1.0",
+        "+CurveTable=/Game/Curves/GameData;RowUpdate;Default.Tick;0.0;0.5",
+    ]), encoding="utf-8")
+    ok = [sys.executable, "-c", "pass"]
+    cfg = {
+        "hotfix": {"file": str(hotfix)},
+        "groups": [
+            {"name": "Reload", "match": {"method": "regex", "tables": ["BlastBerry"]}, "ops": ["RowUpdate"], "cmd": ok},
+            {"name": "Curves", "match": {"method": "regex", "tables": ["GameData"]}, "ops": ["RowUpdate"], "cmd": ok},
+        ],
+    }
+    ran, skipped = [], []
+    w.one_cycle(cfg, None, skip_groups={"Reload"},
+                on_group_done=lambda name, rc: ran.append(name),
+                on_group_skipped=lambda name, tables: skipped.append((name, tables)))
+    assert ran == ["Curves"]
+    assert skipped == [("Reload", ["BlastBerryLootPackages"])]
+
+    # 再開時は停止していたグループだけを再実行できる
+    ran.clear()
+    w.one_cycle(cfg, None, only_groups={"Reload"}, on_group_done=lambda name, rc: ran.append(name))
+    assert ran == ["Reload"]
+
+def test_worker_pool_is_shared_across_threads():
+    import threading
+    pools = []
+    barrier = threading.Barrier(4)
+
+    def grab():
+        barrier.wait()
+        pools.append(w.get_worker_pool({"workers": {"max": 1}}))
+
+    threads = [threading.Thread(target=grab) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert len({id(p) for p in pools}) == 1
+    finally:
+        w._discard_broken_pool(pools[0])
+    assert w._POOL is None
+
+def test_order_by_priority_is_stable():
+    to_run = [("a", {}, []), ("b", {"priority": 100}, []), ("c", {"priority": 5}, []), ("d", {"priority": 100}, [])]
+    assert [x[0] for x in w.order_by_priority(to_run)] == ["b", "d", "c", "a"]
+
+def test_run_groups_runs_fast_lane_first_and_hands_off_the_rest(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    release = threading.Event()
+    calls = []
+
+    def fake_run_group(cfg, name, gdef, matched, hotfix_file):
+        if name == "slow":
+            release.wait(5)
+        calls.append((name, threading.current_thread().name))
+        return 0
+
+    monkeypatch.setattr(w, "run_group", fake_run_group)
+    done = []
+    to_run = [
+        ("slow", {"priority": 50}, []),
+        ("rest", {}, []),
+        ("fast", {"lane": "fast"}, []),
+    ]
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="bg") as bg:
+        w.run_groups({}, to_run, "Hotfix.ini", on_group_done=lambda n, rc: done.append(n), background=bg)
+        # fast レーンは呼び出し元スレッドで実行済み、残りはまだバックグラウンドで待っている
+        assert done == ["fast"]
+        assert calls == [("fast", threading.current_thread().name)]
+        release.set()
+    assert done == ["fast", "slow", "rest"]
+    assert all(t.startswith("bg") for _n, t in calls[1:])
@@ -4,12 +4,14 @@ import os
 import re
 import subprocess
 import sys
+import threading
 import time
 import yaml
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+# DataTable / CurveTable などテーブル系ディレクティブを 1 本の正規表現で拾う
 LINE_RE = re.compile(
-    r"""^[+\-]?DataTable=(?P<table_path>[^;]+);(?P<op>[^;]+);(?P<row>[^;]+)(?:;(?P<rest>.*))?$""",
+    r"""^[+\-]?(?P<kind>[A-Za-z]*Table)=(?P<table_path>[^;]+);(?P<op>[^;]+);(?P<row>[^;]+)(?:;(?P<rest>.*))?$""",
     re.UNICODE,
 )
 
@@ -17,9 +19,9 @@ def load_cfg(path: str) -> dict:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
-def run_cmd(cmd: List[str], cwd: Optional[str] = None) -> Tuple[int, str, str]:
+def run_cmd(cmd: List[str], cwd: Optional[str] = None, env: Optional[dict] = None) -> Tuple[int, str, str]:
     try:
-        p = subprocess.run(cmd, cwd=cwd, text=True, capture_output=True)
+        p = subprocess.run(cmd, cwd=cwd, env=env, text=True, capture_output=True)
         return p.returncode, (p.stdout or "").strip(), (p.stderr or "").strip()
     except Exception as e:
         return 1, "", f"Failed to run {cmd}: {e}"
@@ -38,9 +40,9 @@ def table_basename(table_path: str) -> str:
     base = os.path.splitext(base)[0]
     return base
 
-def parse_hotfix(text: str) -> List[dict]:
-    events = []
-    for raw in text.splitlines():
+def iter_hotfix_events(lines: Iterable[str]) -> Iterator[dict]:
+    # 行のイテラブル（開いたファイルなど）を 1 行ずつ解析するジェネレータ
+    for raw in lines:
         raw = raw.strip()
         if not raw or raw.startswith("#"):
             continue
@@ -48,14 +50,17 @@ def parse_hotfix(text: str) -> List[dict]:
         if not m:
             continue
         d = m.groupdict()
-        events.append({
+        yield {
+            "kind": d["kind"],
             "table": table_basename(d["table_path"]),
             "op": d["op"],
             "row": d["row"],
             "rest": d.get("rest") or "",
             "raw": raw,
-        })
-    return events
+        }
+
+def parse_hotfix(text: str) -> List[dict]:
+    return list(iter_hotfix_events(text.splitlines()))
 
 def match_table(name: str, matcher: dict) -> bool:
     method = matcher.get("method", "exact")
@@ -71,16 +76,225 @@ def match_table(name: str, matcher: dict) -> bool:
     else:
         return False
 
+def match_kind(kind: str, matcher: dict) -> bool:
+    # kinds 未指定なら全種別（DataTable / CurveTable ...）を対象にする
+    kinds = matcher.get("kinds")
+    if not kinds:
+        return True
+    return kind in kinds
+
 def filter_events(events: List[dict], matcher: dict, ops: List[str]) -> List[dict]:
     out = []
     for e in events:
         if e["op"] not in ops:
             continue
+        if not match_kind(e["kind"], matcher):
+            continue
         if match_table(e["table"], matcher):
             out.append(e)
     return out
 
-def one_cycle(cfg: dict, last_hash: Optional[str], only_tables: Optional[set] = None) -> Optional[str]:
+def plan_groups(cfg: dict, events: List[dict]) -> List[Tuple[str, dict, List[dict]]]:
+    """
+    発火するグループを YAML 順に返す: [(group_name, group_def, matched_events)]
+    """
+    groups = cfg.get("groups", [])
+    to_run = []
+    fired_groups = set()
+
+    for g in groups:
+        name = g["name"]
+        matched = filter_events(events, g["match"], g["ops"])
+        if matched:
+            if name not in fired_groups:
+                to_run.append((name, g, matched))
+                fired_groups.add(name)
+
+    # 交差トリガー
+    for ct in cfg.get("cross_triggers", []):
+        src_matched = filter_events(events, ct["source"], ct["source"]["ops"] if "ops" in ct["source"] else ct.get("ops", []))
+        # ↑ source の ops は source 内に書いてあるケース/外だと ct["ops"] の両対応
+        if src_matched:
+            tgt = ct["target_group"]
+            if tgt not in fired_groups:
+                # 対象グループの定義を引く
+                gdef = next((g for g in groups if g["name"] == tgt), None)
+                if gdef:
+                    to_run.append((tgt, gdef, src_matched))
+                    fired_groups.add(tgt)
+    return to_run
+
+# ===== entrypoint 実行（常駐ワーカープール） =====
+_POOL = None          # プロセス内で使い回す ProcessPoolExecutor
+_POOL_LOCK = threading.Lock()  # fast レーンとバックグラウンドの両スレッドから使うので作成・破棄は排他
+_ENTRYPOINTS = {}     # ワーカー側: "module:function" → 関数（import は初回だけ）
+
+def get_worker_pool(cfg: dict):
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from concurrent.futures import ProcessPoolExecutor
+            max_workers = (cfg.get("workers") or {}).get("max", 2)
+            _POOL = ProcessPoolExecutor(max_workers=max_workers)
+        return _POOL
+
+def _discard_broken_pool(pool) -> None:
+    # 別スレッドが既に作り直していたら、新しいプールには触らない
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _resolve_entrypoint(spec: str, path: Optional[str]):
+    fn = _ENTRYPOINTS.get((spec, path))
+    if fn is None:
+        import importlib
+        if path and path not in sys.path:
+            sys.path.insert(0, path)
+        mod_name, _, func_name = spec.partition(":")
+        fn = getattr(importlib.import_module(mod_name), func_name or "main")
+        _ENTRYPOINTS[(spec, path)] = fn
+    return fn
+
+def _call_entrypoint(spec: str, path: Optional[str], payload: dict) -> Tuple[int, str, str]:
+    # ワーカープロセス内で実行される
+    import traceback
+    try:
+        rv = _resolve_entrypoint(spec, path)(payload)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        return code, "", ""
+    except Exception:
+        return 1, "", traceback.format_exc()
+    return (rv if isinstance(rv, int) else 0), "", ""
+
+def run_entrypoint(cfg: dict, gdef: dict, matched: List[dict], hotfix_file: str) -> Tuple[int, str, str]:
+    """
+    entrypoint: "module:function" のグループを常駐ワーカーで実行する。
+    function(payload) には解析済みイベントと対象行をそのまま渡す:
+        payload = {"group", "hotfix_file", "events", "rows": {table: [row, ...]}}
+    rows は「変更のあったテーブルについて、今の Hotfix.ini で op が当たっている行」全部。
+    前回から値が変わった行だけではない（テーブル単位で差分を取っているため）。
+    戻り値が int ならそれを rc とする。rc≠0（例外含む）で cmd があれば cmd で再実行する。
+    """
+    rows: Dict[str, List[str]] = {}
+    for e in matched:
+        table_rows = rows.setdefault(e["table"], [])
+        if e["row"] not in table_rows:
+            table_rows.append(e["row"])
+    payload = {
+        "group": gdef["name"],
+        "hotfix_file": hotfix_file,
+        "events": matched,
+        "rows": rows,
+    }
+    from concurrent.futures.process import BrokenProcessPool
+    pool = get_worker_pool(cfg)
+    try:
+        fut = pool.submit(_call_entrypoint, gdef["entrypoint"], gdef.get("entrypoint_path"), payload)
+        rc, out, err = fut.result()
+        if rc != 0 and gdef.get("cmd"):
+            # entrypoint が失敗（例外・rc≠0）したら cmd で再実行
+            print(f"[WARN] entrypoint rc={rc}; falling back to cmd", flush=True)
+            if err:
+                print(err, flush=True)
+            return run_cmd(gdef["cmd"], env=cmd_env(hotfix_file))
+        return rc, out, err
+    except Exception as e:
+        # プールが壊れた（ワーカー異常終了など）ときだけ作り直す。
+        # それ以外（payload を送れない等）で共有プールを止めると、他スレッドの実行中ジョブまで巻き込む
+        if isinstance(e, BrokenProcessPool):
+            _discard_broken_pool(pool)
+        if gdef.get("cmd"):
+            print(f"[WARN] entrypoint failed ({e}); falling back to cmd", flush=True)
+            return run_cmd(gdef["cmd"], env=cmd_env(hotfix_file))
+        return 1, "", f"Failed to run {gdef['entrypoint']}: {e}"
+
+_MATERIALIZER = None  # --watch 中はプロセス内に保持して差分更新
+
+def update_materialized(path: str, events: List[dict]) -> None:
+    global _MATERIALIZER
+    from hotfix_materialize import Materializer
+    if _MATERIALIZER is None:
+        _MATERIALIZER = Materializer.load(path)
+    changed = _MATERIALIZER.update(events)
+    if changed:
+        _MATERIALIZER.save(path)
+        print(f"[INFO] materialized {len(changed)} table(s) -> {path}", flush=True)
+
+def order_by_priority(to_run: List[Tuple[str, dict, List[dict]]]) -> List[Tuple[str, dict, List[dict]]]:
+    # priority が大きいほど先。同じ priority 内は YAML 順（安定ソート）
+    return sorted(to_run, key=lambda x: -int(x[1].get("priority", 0)))
+
+def cmd_env(hotfix_file: str) -> dict:
+    # cmd グループには今回の Hotfix.ini（サイクルごとのスナップショット）の場所を渡す
+    return dict(os.environ, HOTFIX_FILE=os.path.abspath(hotfix_file))
+
+def run_group(cfg: dict, name: str, gdef: dict, matched: List[dict], hotfix_file: str) -> int:
+    if gdef.get("entrypoint"):
+        print(f"[TRIGGER] {name} -> {gdef['entrypoint']} (worker pool)", flush=True)
+        rc, out, err = run_entrypoint(cfg, gdef, matched, hotfix_file)
+    else:
+        cmd = gdef["cmd"]
+        print(f"[TRIGGER] {name} -> {' '.join(cmd)}", flush=True)
+        rc, out, err = run_cmd(cmd, env=cmd_env(hotfix_file))
+    print(f"[RUN] {name} rc={rc}", flush=True)
+    if out:
+        print(out, flush=True)
+    if err:
+        print(err, flush=True)
+    return rc
+
+def run_groups(cfg: dict, to_run: List[Tuple[str, dict, List[dict]]], hotfix_file: str,
+               on_group_done: Optional[Callable[[str, int], None]] = None,
+               background=None) -> None:
+    """
+    priority 順に実行する。lane: "fast" のグループを先に実行し終えてから残りを実行。
+    background（Executor）を渡すと、fast 以外のグループはそこへ投げて待たずに戻る。
+    on_group_done(name, rc) は各グループの完了ごとに呼ばれる（通知・公開用）。
+    """
+    ordered = order_by_priority(to_run)
+    fast = [x for x in ordered if x[1].get("lane") == "fast"]
+    rest = [x for x in ordered if x[1].get("lane") != "fast"]
+
+    def run_one(name, gdef, matched):
+        rc = run_group(cfg, name, gdef, matched, hotfix_file)
+        if on_group_done is not None:
+            try:
+                on_group_done(name, rc)
+            except Exception as e:
+                print(f"[WARN] on_group_done({name}) failed: {e}", flush=True)
+        return rc
+
+    for x in fast:
+        run_one(*x)
+
+    if background is not None and rest:
+        def run_rest():
+            for x in rest:
+                run_one(*x)
+
+        def log_error(fut):
+            exc = fut.exception()
+            if exc is not None:
+                print(f"[WARN] background groups failed: {exc!r}", flush=True)
+
+        background.submit(run_rest).add_done_callback(log_error)
+    else:
+        for x in rest:
+            run_one(*x)
+
+def one_cycle(cfg: dict, last_hash: Optional[str], only_tables: Optional[set] = None,
+              on_group_done: Optional[Callable[[str, int], None]] = None,
+              background=None, skip_groups: Optional[set] = None,
+              on_group_skipped: Optional[Callable[[str, List[str]], None]] = None,
+              only_groups: Optional[set] = None) -> Optional[str]:
+    """
+    skip_groups に入っているグループ（"*" なら全て）は実行せず、
+    on_group_skipped(name, tables) で「本来発火していた変更テーブル」を知らせる（再開時の再実行用）。
+    only_groups を渡すとそのグループだけ実行する。
+    """
     # 1) 取得
     fetch_cmd = cfg.get("hotfix", {}).get("fetch_cmd")
     if fetch_cmd:
@@ -100,52 +314,37 @@ def one_cycle(cfg: dict, last_hash: Optional[str], only_tables: Optional[set] =
 
 
     # 2) 解析
+    # ファイル全体を読み込まず 1 行ずつ解析（対象外テーブルのイベントは保持しない）
+    materialize_out = cfg["hotfix"].get("materialize_out")
     with open(hotfix_file, "r", encoding="utf-8", errors="ignore") as f:
-        text = f.read()
-    events = parse_hotfix(text)
-
-    if only_tables:
-        events = [e for e in events if e["table"] in only_tables]
-
-    # 3) グループごとに判定
-    groups = cfg.get("groups", [])
-    to_run = []  # [(group_name, cmd)]
-    fired_groups = set()
+        events = iter_hotfix_events(f)
+        if materialize_out:
+            # マージ済みテーブル状態は全テーブル分の op が必要なので、絞り込み前に更新
+            events = list(events)
+            update_materialized(materialize_out, events)
+        events = [e for e in events
+                  if not only_tables or e["table"] in only_tables]
 
-    for g in groups:
-        name = g["name"]
-        matched = filter_events(events, g["match"], g["ops"])
-        if matched:
-            if name not in fired_groups:
-                to_run.append((name, g["cmd"]))
-                fired_groups.add(name)
+    # 3) 4) グループ判定・交差トリガー
+    to_run = plan_groups(cfg, events)
+    if only_groups is not None:
+        to_run = [x for x in to_run if x[0] in only_groups]
 
-    # 4) 交差トリガー
-    for ct in cfg.get("cross_triggers", []):
-        src_matched = filter_events(events, ct["source"], ct["source"]["ops"] if "ops" in ct["source"] else ct.get("ops", []))
-        # ↑ source の ops は source 内に書いてあるケース/外だと ct["ops"] の両対応
-        if src_matched:
-            tgt = ct["target_group"]
-            if tgt not in fired_groups:
-                # 対象グループの cmd を引く
-                gdef = next((g for g in groups if g["name"] == tgt), None)
-                if gdef:
-                    to_run.append((tgt, gdef["cmd"]))
-                    fired_groups.add(tgt)
+    # 一時停止中のグループ（"*" なら全グループ）は実行しない
+    if skip_groups:
+        for name, _gdef, matched in to_run:
+            if "*" in skip_groups or name in skip_groups:
+                print(f"[PAUSED] {name}", flush=True)
+                if on_group_skipped is not None:
+                    on_group_skipped(name, sorted({e["table"] for e in matched}))
+        to_run = [x for x in to_run if "*" not in skip_groups and x[0] not in skip_groups]
 
     # 5) 実行
     if not to_run:
         print("[INFO] No trigger.", flush=True)
         return h
 
-    for (name, cmd) in to_run:
-        print(f"[TRIGGER] {name} -> {' '.join(cmd)}", flush=True)
-        rc, out, err = run_cmd(cmd)
-        print(f"[RUN] rc={rc}", flush=True)
-        if out:
-            print(out, flush=True)
-        if err:
-            print(err, flush=True)
+    run_groups(cfg, to_run, hotfix_file, on_group_done=on_group_done, background=background)
 
     # 6) ハッシュ更新
     return h
@@ -156,25 +355,32 @@ def main():
     ap.add_argument("--once", action="store_true")
     ap.add_argument("--watch", type=int, default=0)
     ap.add_argument("--only-tables", default="", help="カンマ区切りのテーブル名だけ処理（例: A,B,C）")
+    ap.add_argument("--hotfix-file", default=None, help="hotfix.file の代わりに読む Hotfix.ini（スナップショットなど）")
+    ap.add_argument("--skip-groups", default="", help="カンマ区切りのグループ名は実行しない（* で全て）")
+    ap.add_argument("--only-groups", default="", help="カンマ区切りのグループ名だけ実行する")
     args = ap.parse_args()
 
     cfg = load_cfg(args.config)
+    if args.hotfix_file:
+        cfg["hotfix"]["file"] = args.hotfix_file
     last_hash = None
 
     # ← 追加: --only-tables をセット化（空なら None）
     only = set([s for s in (args.only_tables or "").split(",") if s.strip()]) or None
+    skip = set([s for s in (args.skip_groups or "").split(",") if s.strip()]) or None
+    only_groups = set([s for s in (args.only_groups or "").split(",") if s.strip()]) or None
 
     if args.once:
-        last_hash = one_cycle(cfg, last_hash, only_tables=only)  # ← 引数追加
+        last_hash = one_cycle(cfg, last_hash, only_tables=only, skip_groups=skip, only_groups=only_groups)  # ← 引数追加
         return
 
     if args.watch > 0:
         print(f"[INFO] Watching every {args.watch}s ...", flush=True)
         while True:
-            last_hash = one_cycle(cfg, last_hash, only_tables=only)  # ← 引数追加
+            last_hash = one_cycle(cfg, last_hash, only_tables=only, skip_groups=skip, only_groups=only_groups)  # ← 引数追加
             time.sleep(args.watch)
     else:
-        last_hash = one_cycle(cfg, last_hash, only_tables=only)      # ← 引数追加
+        last_hash = one_cycle(cfg, last_hash, only_tables=only, skip_groups=skip, only_groups=only_groups)      # ← 引数追加
 
 if __name__ == "__main__":
     main()